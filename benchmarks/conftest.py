@@ -0,0 +1,43 @@
+"""
+Configuration of the benchmark suite (pytest-benchmark).
+
+The runs are saved as JSON in benchmarks/baselines. A run compared to a saved one fails when the median time of a
+benchmark is more than --slowdown percent higher:
+
+    python -m pytest benchmarks --benchmark-save=baseline
+    python -m pytest benchmarks --benchmark-compare --slowdown 10
+"""
+
+import os
+import sys
+import pytest
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+BASELINE_DIR = os.path.join(current_dir, "baselines")
+
+# Default of the --benchmark-storage option of pytest-benchmark
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--slowdown", type=int, default=None,
+                     help="fail when the median time of a benchmark is more than this percentage above the compared run")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before the configuration of pytest-benchmark, which reads the options below
+    if not config.pluginmanager.hasplugin("benchmark"):
+        return
+
+    if config.getoption("benchmark_storage") == DEFAULT_STORAGE:
+        config.option.benchmark_storage = "file://" + BASELINE_DIR
+
+    slowdown = config.getoption("slowdown")
+    if slowdown is not None and not config.getoption("benchmark_compare_fail"):
+        from pytest_benchmark.utils import parse_compare_fail
+        config.option.benchmark_compare_fail = [parse_compare_fail(f"median:{slowdown}%")]
@@ -0,0 +1,41 @@
+"""
+Benchmarks of the mate puzzles: the time to find the mate with mate_search and with the iterative deepening,
+and the mating move and the mate score found.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from minmax import *
+
+# Mate puzzles: position, number of moves of the mate and the mating move
+MATE_PUZZLES = {
+    "back_rank": ("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", 1, "a1a8"),
+    "scholar": ("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 4 4", 1, "f3f7"),
+    "queen_sacrifice": ("r1b2k1r/ppp1bppp/8/1B1Q4/5q2/2P5/PPP2PPP/R3R1K1 w - - 1 1", 2, "d5d8"),
+    "legal_mate": ("r2qkb1r/pp2nppp/3p4/2pNN1B1/2BnP3/3P4/PPP2PPP/R2bK2R w KQkq - 1 1", 2, "d5f6"),
+}
+
+
+def board_from_fen(fen):
+    board = Board()
+    board.from_fen(fen)
+    return board
+
+
+@pytest.mark.parametrize("name", MATE_PUZZLES)
+def test_mate_search(benchmark, name):
+    fen, moves, solution = MATE_PUZZLES[name]
+    board = board_from_fen(fen)
+    move = benchmark.pedantic(mate_search, args=(board, moves), rounds=3)
+    assert move.to_uci() == solution
+
+
+@pytest.mark.parametrize("name", MATE_PUZZLES)
+def test_iterative_deepening(benchmark, name):
+    fen, moves, solution = MATE_PUZZLES[name]
+    board = board_from_fen(fen)
+    move, score, _ = benchmark.pedantic(lambda: iterative_deepening(board, 2 * moves - 1), rounds=1)
+    assert move.to_uci() == solution
+    assert mate_in(score) == moves
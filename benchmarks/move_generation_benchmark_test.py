@@ -0,0 +1,87 @@
+"""
+Benchmarks of the move generation: legal moves, apply_move, attacked squares, FEN conversions and perft.
+The perft counts are checked too, so a faster but wrong move generation fails.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from board import *
+
+# Perft positions (https://www.chessprogramming.org/Perft_Results) with their number of nodes at each depth
+PERFT_POSITIONS = {
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079]),
+    "promotions": ("n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1", [24, 496]),
+    "underpromotion_check": ("8/P1k5/K7/8/8/8/8/8 w - - 0 1", [6, 27, 273]),
+    "promotion_out_of_check": ("2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", [11, 133, 1442]),
+    "illegal_en_passant": ("3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", [18, 92, 1670]),
+    "en_passant_discovered_check": ("8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", [15, 126, 1928]),
+}
+
+KIWIPETE = PERFT_POSITIONS["kiwipete"][0]
+
+
+def perft(board, depth):
+    """
+    Count the number of legal positions at a given depth.
+
+    Parameters:
+        board (Board): The current chessboard state.
+        depth (int): The depth to search for legal positions.
+
+    Returns:
+        int: The number of legal positions at the given depth.
+    """
+    if depth == 0:
+        return 1
+    return sum(perft(board.apply_move(move), depth - 1) for move in generate_legal_moves(board))
+
+
+def board_from_fen(fen):
+    board = Board()
+    board.from_fen(fen)
+    return board
+
+
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_perft(benchmark, name):
+    fen, counts = PERFT_POSITIONS[name]
+    board = board_from_fen(fen)
+    result = benchmark.pedantic(perft, args=(board, len(counts)), rounds=3)
+    assert result == counts[-1]
+
+
+@pytest.mark.parametrize("name", PERFT_POSITIONS)
+def test_generate_legal_moves(benchmark, name):
+    fen, counts = PERFT_POSITIONS[name]
+    board = board_from_fen(fen)
+    moves = benchmark(lambda: list(generate_legal_moves(board)))
+    assert len(moves) == counts[0]
+
+
+def test_apply_move(benchmark):
+    board = board_from_fen(KIWIPETE)
+    moves = list(generate_legal_moves(board))
+    benchmark(lambda: [board.apply_move(move) for move in moves])
+
+
+def test_is_square_attacked(benchmark):
+    board = board_from_fen(KIWIPETE)
+    squares = [Square(position) for position in range(64)]
+    attacked = benchmark(lambda: [board.is_square_attacked(square) for square in squares])
+    assert any(attacked)
+
+
+def test_from_fen(benchmark):
+    benchmark(board_from_fen, KIWIPETE)
+
+
+def test_to_fen(benchmark):
+    board = board_from_fen(KIWIPETE)
+    fen = benchmark(board.to_fen)
+    assert fen.split()[0] == KIWIPETE.split()[0]
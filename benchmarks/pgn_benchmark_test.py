@@ -0,0 +1,47 @@
+"""
+Benchmarks of the PGN reader and writer on a fixed set of random games (the same games on every run),
+reported in games per second by dividing the number of games by the mean time.
+"""
+
+import random
+from io import StringIO
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from pgn import *
+
+# Number of games of the benchmark PGN and maximum number of half moves of each game
+GAMES = 20
+MAX_PLIES = 80
+
+
+@pytest.fixture(scope="module")
+def benchmark_pgn():
+    """
+    Play random games from the standard position with a fixed seed and write them in PGN.
+    """
+    generator = random.Random(0)
+    text = StringIO()
+    for index in range(GAMES):
+        game = Game({"Event": "Benchmark", "Round": str(index + 1)})
+        board = game.initial_board()
+        while len(game.moves) < MAX_PLIES and not is_game_over(board):
+            move = generator.choice(list(generate_legal_moves(board)))
+            game.moves.append(move)
+            board = board.apply_move(move)
+        write_game(text, game)
+    return text.getvalue()
+
+
+def test_read_games(benchmark, benchmark_pgn):
+    games = benchmark.pedantic(lambda: list(read_games(StringIO(benchmark_pgn))), rounds=3)
+    assert len(games) == GAMES
+    benchmark.extra_info["games_per_second"] = GAMES / benchmark.stats.stats.mean
+
+
+def test_write_games(benchmark, benchmark_pgn):
+    games = list(read_games(StringIO(benchmark_pgn)))
+    text = benchmark.pedantic(lambda: "".join(game_to_pgn(game) for game in games), rounds=3)
+    assert text == benchmark_pgn
+    benchmark.extra_info["games_per_second"] = GAMES / benchmark.stats.stats.mean
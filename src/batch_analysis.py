@@ -0,0 +1,222 @@
+"""
+batch_analysis.py - Batch Position Analysis
+
+This file analyses a large number of positions in a process pool. The positions (FEN or EPD, one per line) are read
+lazily from a file or the standard input and only a bounded number of them is in flight, so the memory does not grow
+with the size of the input. Each worker keeps its search state (transposition table) from one position to the next.
+The results are written as JSON lines (best move, score, depth, nodes, time), in the order of the input or as soon
+as they are completed.
+
+    python src/batch_analysis.py positions.epd --depth 3 --workers 4 --output results.jsonl --offset-file positions.offset
+
+With an offset file, the number of input lines done is saved after each result, and a new run starts after them:
+an interrupted analysis is resumed by running the same command again (in completed order, the results of a few lines
+after the offset may be written twice, they have the same 'line').
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from minmax import *
+
+# Depth of the analysis when neither a depth nor a time limit is given
+DEFAULT_DEPTH = 3
+
+# Size of the transposition table of each worker
+WORKER_TT_SIZE = 1 << 18
+
+# Search state of the worker process, kept between its positions
+worker_search = None
+
+
+def parse_position(line: str) -> tuple:
+    """
+    Read a position written as a FEN or as an EPD (four FEN fields followed by operations such as 'bm e4; id "x";').
+
+    Parameters:
+        line (str): The FEN or EPD line.
+
+    Returns:
+        tuple: The FEN of the position and the EPD operations as a dictionary (empty for a FEN).
+    """
+    fields = line.split()
+    if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+        return " ".join(fields[:6]), {}
+
+    operations = {}
+    for operation in " ".join(fields[4:]).split(";"):
+        opcode, _, operand = operation.strip().partition(" ")
+        if opcode:
+            operations[opcode] = operand.strip().strip('"')
+
+    clocks = [operations.pop("hmvc", "0"), operations.pop("fmvn", "1")]
+    return " ".join(fields[:4] + clocks), operations
+
+
+def init_worker(tt_size: int = WORKER_TT_SIZE) -> None:
+    """
+    Create the search state of a worker process.
+    """
+    global worker_search
+    worker_search = Search(tt_size)
+
+
+def analyse_position(line: str, depth: int = None, time_limit: float = None) -> dict:
+    """
+    Analyse one position (in a worker process) with the search state of the worker.
+
+    Parameters:
+        line (str): The position as a FEN or EPD line.
+        depth (int): The depth of the search, None to only use the time limit.
+        time_limit (float): Time in seconds given to the search, None for no limit.
+
+    Returns:
+        dict: The FEN, the best move (UCI, None if the game is over), the score in pawns (and the moves before the
+              mate if there is one), the depth reached, the nodes and the time, the EPD operations if any,
+              or the error if the line is not a valid position.
+    """
+    if worker_search is None:
+        init_worker()
+
+    try:
+        fen, operations = parse_position(line)
+        board = Board()
+        board.from_fen(fen)
+    except (ValueError, IndexError, KeyError, AttributeError) as error:
+        return {"fen": line, "error": f"Invalid position: {error}"}
+
+    start_time = time.perf_counter()
+    move, score, completed_depth = iterative_deepening(board, depth, time_limit, worker_search)
+    record = {
+        "fen": fen,
+        "move": move.to_uci() if move is not None else None,
+        "score": float(score) if score is not None else None,
+        "mate": mate_in(score) if score is not None else None,
+        "depth": completed_depth,
+        "nodes": worker_search.nodes,
+        "time": time.perf_counter() - start_time,
+    }
+    if operations:
+        record["epd"] = operations
+    return record
+
+
+def analyse_batch(lines, depth: int = None, time_limit: float = None, workers: int = None, ordered: bool = True,
+                  start: int = 0, progress=None):
+    """
+    Analyse positions in a process pool, reading them as they are needed.
+
+    Parameters:
+        lines (iterable): The input lines (FEN or EPD), e.g. an open file. Blank lines and lines starting with '#'
+                          are skipped.
+        depth (int): The depth of the search, DEFAULT_DEPTH if neither the depth nor the time limit is given.
+        time_limit (float): Time in seconds given to the search of each position, None for no limit.
+        workers (int): Number of processes, the number of CPUs if not given.
+        ordered (bool): Yield the results in the order of the input, otherwise as soon as they are completed.
+        start (int): Number of lines skipped at the beginning of the input (to resume an analysis).
+        progress (callable): Called after each result with the number of input lines done, counted from the
+                             beginning of the input (all the results of these lines have been yielded).
+
+    Yields:
+        dict: The result of each position (see analyse_position) with its line number (from 0) as 'line'.
+    """
+    if depth is None and time_limit is None:
+        depth = DEFAULT_DEPTH
+    workers = workers or os.cpu_count()
+    window = 4 * workers  # Maximum number of positions submitted and not yielded yet
+
+    positions = ((number, line.strip()) for number, line in enumerate(itertools.islice(lines, start, None), start))
+    positions = ((number, line) for number, line in positions if line and not line.startswith("#"))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        pending = {}  # future -> line number
+        completed = {}  # line number -> result, waiting for the previous lines in ordered mode
+        submitted = []  # Line numbers not yielded yet, in input order
+        yielded = set()  # Line numbers yielded after a line not yielded yet
+        last_line = start - 1  # Last line read from the input
+        exhausted = False
+
+        def lines_done():
+            return submitted[0] if submitted else last_line + 1
+
+        while True:
+            while not exhausted and len(submitted) < window:
+                position = next(positions, None)
+                if position is None:
+                    exhausted = True
+                    break
+                number, line = position
+                last_line = number
+                pending[pool.submit(analyse_position, line, depth, time_limit)] = number
+                submitted.append(number)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                number = pending.pop(future)
+                completed[number] = dict(line=number, **future.result())
+
+            if ordered:
+                ready = list(itertools.takewhile(lambda number: number in completed, submitted))
+            else:
+                ready = sorted(completed)
+
+            for number in ready:
+                record = completed.pop(number)
+                yielded.add(number)
+                while submitted and submitted[0] in yielded:
+                    yielded.remove(submitted.pop(0))
+                yield record
+                if progress is not None:
+                    progress(lines_done())
+
+        if progress is not None:
+            # The lines skipped at the end of the input are done too
+            progress(last_line + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse the positions of a FEN or EPD file in parallel.")
+    parser.add_argument("input", nargs="?", default="-", help="file with one FEN or EPD per line (default: stdin)")
+    parser.add_argument("--depth", type=int, default=None, help=f"depth of the search (default: {DEFAULT_DEPTH})")
+    parser.add_argument("--time", type=float, default=None, help="time of the search of each position in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--unordered", action="store_true", help="write the results as soon as they are completed")
+    parser.add_argument("--output", default=None, help="JSONL file where the results are appended (default: stdout)")
+    parser.add_argument("--offset-file", default=None,
+                        help="file where the number of input lines done is saved, to resume the analysis")
+    args = parser.parse_args()
+
+    start = 0
+    if args.offset_file is not None and os.path.exists(args.offset_file):
+        with open(args.offset_file) as file:
+            start = int(file.read().strip() or 0)
+
+    def save_offset(lines_done):
+        if args.offset_file is not None:
+            # Written next to the offset file and renamed, so an interruption never leaves a partial offset
+            with open(args.offset_file + ".tmp", "w") as file:
+                file.write(f"{lines_done}\n")
+            os.replace(args.offset_file + ".tmp", args.offset_file)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = open(args.output, "a") if args.output else sys.stdout
+    try:
+        for record in analyse_batch(source, args.depth, args.time, args.workers, not args.unordered, start, save_offset):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+bench.py - Engine Benchmark
+
+This file searches a fixed set of positions to a fixed depth and reports the total number of nodes, the time and the
+speed (nodes per second). The number of nodes is a signature of the search: it must not change with pure speed work,
+only with changes of the search or of the evaluation. The hot functions (move generation, apply_move, evaluate and
+is_game_over) are also timed separately on the same positions.
+
+    python src/bench.py [--depth 2] [--json] [--profile]
+"""
+
+import argparse
+import json
+import time
+import profiler
+from board import *
+from evaluation import *
+from minmax import *
+
+BENCH_FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 11",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+    "r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - 1 16",
+    "4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - 1 17",
+    "2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - 0 11",
+    "r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - 1 16",
+    "3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - 6 22",
+    "r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - 2 18",
+    "4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - 3 22",
+    "3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - 4 26",
+    "6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/8 b - - 3 54",
+    "3b4/5kp1/1p1p1p1p/pP1PpP1P/P1P1P3/3KN3/8/8 w - - 0 1",
+    "2K5/p7/7P/5pR1/8/5k2/r7/8 w - - 0 1",
+    "8/6pk/1p6/8/PP3p1p/5P2/4KP1q/3Q4 w - - 0 1",
+    "7k/3p2pp/4q3/8/4Q3/5Kp1/P6b/8 w - - 0 1",
+    "8/2p5/8/2kPKp1p/2p4P/2P5/3P4/8 w - - 0 1",
+    "8/1p3pp1/7p/5P1P/2k3P1/8/2K2P2/8 w - - 0 1",
+    "8/pp2r1k1/2p1p3/3pP2p/1P1P1P1P/P5KR/8/8 w - - 0 1",
+    "8/3p4/p1bk3p/Pp6/1Kp1PpPp/2P2P1P/2P5/5B2 b - - 0 1",
+    "5k2/7R/4P2p/5K2/p1r2P1p/8/8/8 b - - 0 1",
+    "6k1/6p1/P6p/r1N5/5p2/7P/1b3PP1/4R1K1 w - - 0 1",
+    "1r3k2/4q3/2Pp3b/3Bp3/2Q2p2/1p1P2P1/1P2KP2/3N4 w - - 0 1",
+    "6k1/4pp1p/3p2p1/P1pPb3/R7/1r2P1PP/3B1P2/6K1 w - - 0 1",
+    "8/3p3B/5p2/5P2/p7/PP5b/k7/6K1 w - - 0 1",
+]
+
+# Default depth of the search of each position
+BENCH_DEPTH = 2
+
+
+def time_sections(boards: list, iterations: int = 3) -> dict:
+    """
+    Time the hot functions of the engine separately on the given positions.
+
+    Parameters:
+        boards (list): The positions.
+        iterations (int): Number of times each function is called on each position.
+
+    Returns:
+        dict: For each section, the number of calls, the total time in seconds and the time per call in microseconds.
+    """
+    totals = {"move_generation": [0, 0.0], "apply_move": [0, 0.0], "evaluate": [0, 0.0], "is_game_over": [0, 0.0]}
+
+    def record(section, calls, start):
+        totals[section][0] += calls
+        totals[section][1] += time.perf_counter() - start
+
+    for board in boards:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            moves = list(generate_legal_moves(board))
+            record("move_generation", 1, start)
+
+            start = time.perf_counter()
+            for move in moves:
+                board.apply_move(move)
+            record("apply_move", len(moves), start)
+
+            start = time.perf_counter()
+            evaluate(board)
+            record("evaluate", 1, start)
+
+            # The status is cached on the board, reset it to time the real work
+            board.status = None
+            start = time.perf_counter()
+            is_game_over(board)
+            record("is_game_over", 1, start)
+
+    return {section: {"calls": calls, "time": total, "per_call_us": total / calls * 1e6 if calls else 0.0}
+            for section, (calls, total) in totals.items()}
+
+
+def run_bench(depth: int = BENCH_DEPTH, fens: list = None, iterations: int = 3) -> dict:
+    """
+    Search every position of the suite to the given depth (with an empty transposition table for each one)
+    and time the hot functions.
+
+    Parameters:
+        depth (int): The depth of the search.
+        fens (list): The positions, the bench suite if not given.
+        iterations (int): Number of calls of each hot function on each position.
+
+    Returns:
+        dict: The depth, the number of positions, the total nodes, time and nodes per second, and the sections timings.
+    """
+    boards = []
+    for fen in fens or BENCH_FENS:
+        board = Board()
+        board.from_fen(fen)
+        boards.append(board)
+
+    nodes = 0
+    start = time.perf_counter()
+    for board in boards:
+        search = Search()
+        iterative_deepening(board, max_depth=depth, search=search)
+        nodes += search.nodes
+    elapsed = time.perf_counter() - start
+
+    return {
+        "depth": depth,
+        "positions": len(boards),
+        "nodes": nodes,
+        "time": elapsed,
+        "nps": int(nodes / elapsed) if elapsed > 0 else 0,
+        "sections": time_sections(boards, iterations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a fixed set of positions and report the speed of the engine.")
+    parser.add_argument("--depth", type=int, default=BENCH_DEPTH, help="depth of the search of each position")
+    parser.add_argument("--iterations", type=int, default=3, help="calls of each hot function on each position")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--profile", action="store_true", help="time the hot functions and print them at exit")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.enable()
+    else:
+        profiler.enable_from_environment()
+
+    result = run_bench(args.depth, iterations=args.iterations)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for section, timing in result["sections"].items():
+        print(f"{section:<16} {timing['calls']:>8} calls {timing['time']:>9.3f} s {timing['per_call_us']:>10.1f} us/call")
+    print()
+    print(f"Total time (s) : {result['time']:.3f}")
+    print(f"Nodes searched : {result['nodes']}")
+    print(f"Nodes/second   : {result['nps']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,11 @@ import numpy as np
 
 from enums import Color
 import utils
-from enums import PieceType
+from enums import PieceType, GameStatus
 from square import Square
 from move import Move
 import itertools
+import zobrist
 from move_generation import *
 
 class Board:
@@ -47,6 +48,19 @@ class Board:
         # Initialize the en passant square attribute to None
         self.en_passant_square = {Color.WHITE: None, Color.BLACK: None}
 
+        # Zobrist hash of the position, updated incrementally when pieces are set or cleared
+        self.hash = np.uint64(0)
+
+        # Cached result of game_status (None until computed, reset when a piece is set or cleared)
+        self.status = None
+
+        # Number of half moves since the last pawn move or capture (fifty-move rule) and number of the full move
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+
+        # Stack of the hashes of the previous positions since the last pawn move or capture (repetitions)
+        self.history = ()
+
         # Initialize attributes to track whether the king and rooks have moved for both colors
         self.king_moved = {Color.WHITE: False, Color.BLACK: False}
         self.rook_moved = {Color.WHITE: {"queen_side": False, "king_side": False},
@@ -106,6 +120,8 @@ class Board:
         # Combine both white and black pieces to get the bitboard representation of all pieces on the board
         self.all_pieces = self.same_color[Color.WHITE] | self.same_color[Color.BLACK]
 
+        self.hash = zobrist.compute_hash(self)
+
 
     '''---------------------------------------------------------- Representation for chess board ---------------------------------------------------------------'''
     '''---------------------------------------------------------------------------------------------------------------------------------------------------------'''
@@ -183,10 +199,14 @@ class Board:
 
 
         # Halfmove Clock
-        # TODO
+        if len(parts) > 4:
+            self.halfmove_clock = int(parts[4])
 
         #FullMove number
-        # TODO
+        if len(parts) > 5:
+            self.fullmove_number = int(parts[5])
+
+        self.hash = zobrist.compute_hash(self)
 
         return
 
@@ -239,20 +259,24 @@ class Board:
             str_fen += "k"
         if self.can_castle_queenside(Color.BLACK) and self.is_valid_castling(color.BLACK, king_side=False):
             str_fen += "q"
-        
+        if str_fen.endswith(" "):
+            str_fen += "-"
 
-        # En passant
-        en_passant_square_color = self.en_passant_square[self.color_turn]
+        # En passant (the square behind the pawn the opponent has just double pushed)
+        en_passant_square_color = self.en_passant_square[Board.opposite_color(self.color_turn)]
         if en_passant_square_color != None:
-            str_fen += " " + str(en_passant_square_color)
+            if self.color_turn == Color.WHITE:
+                str_fen += " " + str(Square(en_passant_square_color.position + np.uint8(8)))
+            else:
+                str_fen += " " + str(Square(en_passant_square_color.position - np.uint8(8)))
         else:
             str_fen += " -"
 
-        # Halfmove Clock (to change)
-        str_fen += " 0"
+        # Halfmove Clock
+        str_fen += " " + str(self.halfmove_clock)
 
         #FullMove number
-        str_fen += " 1"
+        str_fen += " " + str(self.fullmove_number)
 
         return str_fen
 
@@ -361,6 +385,49 @@ class Board:
         else:
             raise ValueError("Invalid piece type")
 
+    def repetition_count(self) -> int:
+        """
+        Count how many times the current position has already occurred (since the last pawn move or capture).
+
+        Returns:
+            int: The number of previous occurrences of the position (2 means a threefold repetition).
+        """
+        return self.history.count(self.hash)
+
+    def is_repetition(self) -> bool:
+        """
+        Check if the current position has already occurred (since the last pawn move or capture).
+
+        Returns:
+            bool: True if the position is a repetition.
+        """
+        return self.hash in self.history
+
+    def is_in_check(self) -> bool:
+        """
+        Check if the king of the player to move is attacked.
+        """
+        return self.is_square_attacked(Square(utils.lsb_bitscan(self.get_piece_bb(PieceType.KING))))
+
+    def has_non_pawn_material(self) -> bool:
+        """
+        Check if the player to move has other pieces than pawns and king (else zugzwang is likely).
+        """
+        pawns_and_king = self.get_piece_bb(PieceType.PAWN) | self.get_piece_bb(PieceType.KING)
+        return (self.same_color[self.color_turn] & ~pawns_and_king) != EMPTY_BB
+
+    def bitboards(self) -> np.ndarray:
+        """
+        Get the bitboards of all the pieces stacked in a NumPy array.
+
+        Returns:
+            np.ndarray: Array of shape (2, 6) of np.uint64, indexed by [color][piece type].
+        """
+        return np.array(
+            [[self.pawns[color], self.knights[color], self.bishops[color],
+              self.rooks[color], self.queens[color], self.kings[color]] for color in Color],
+            dtype=np.uint64)
+
 
     def piece_on(self, square: Square, color: Color = None):
         """
@@ -473,6 +540,10 @@ class Board:
         self.same_color[color] = utils.set_square(combined_bb, square)
         self.all_pieces = utils.set_square(all_bb, square)
 
+        # Add the piece to the hash
+        self.hash ^= zobrist.PIECE_KEYS[color][piece][square.position]
+        self.status = None
+
     def clear_square(self, square: Square, color: Color = None):
         """
         Clear the piece from the specified square for the specified color.
@@ -517,6 +588,10 @@ class Board:
         self.same_color[color] = utils.clear_square(combined_bb, square)
         self.all_pieces = utils.clear_square(all_bb, square)
 
+        # Remove the piece from the hash
+        self.hash ^= zobrist.PIECE_KEYS[color][piece][square.position]
+        self.status = None
+
     def apply_move(self, move: Move):
         """
         Applies a move to the chessboard and returns a new board without modifying the original.
@@ -540,8 +615,11 @@ class Board:
         new_board.all_pieces = np.copy(self.all_pieces)
         new_board.color_turn = self.color_turn
 
-        # Copy en-passant_square
-        new_board.en_passant_square = self.en_passant_square
+        # Copy en-passant_square (a copy, so that trying moves does not change the en-passant state of this board)
+        new_board.en_passant_square = dict.copy(self.en_passant_square)
+
+        # Start from the current hash without the en-passant file and with the other side to move
+        new_board.hash = self.hash ^ zobrist.en_passant_key(self) ^ zobrist.SIDE_KEY
 
         # Set the en_passant_square of the current color to None
         # Because we can only take en-passant directly after the opposite color played double pushes
@@ -550,6 +628,16 @@ class Board:
         # Get the piece at the source square of the move
         piece = self.piece_on(move.src)
 
+        # Pawn moves and captures are irreversible: reset the fifty-move counter and the repetition history
+        is_capture = move.en_passant or utils.is_set(self.same_color[Board.opposite_color(self.color_turn)], move.dest)
+        if piece == PieceType.PAWN or is_capture:
+            new_board.halfmove_clock = 0
+            new_board.history = ()
+        else:
+            new_board.halfmove_clock = self.halfmove_clock + 1
+            new_board.history = self.history + (self.hash,)
+        new_board.fullmove_number = self.fullmove_number + (1 if self.color_turn == Color.BLACK else 0)
+
         # If there is an en-passant possibillity and it is a pawn and it choose to take en-passant move
         if move.en_passant:
             new_board.clear_square(move.src)
@@ -597,10 +685,39 @@ class Board:
 
         # Update the color turn on the new board
         new_board.color_turn = Board.opposite_color(new_board.color_turn)
+
+        # Add the en-passant file created by this move (if any) to the hash
+        new_board.hash ^= zobrist.en_passant_key(new_board)
      
         #new_board.print_board()
         # Return the new board with the move applied
         return new_board
+
+    def apply_null_move(self):
+        """
+        Pass the turn to the opponent (used by the search, it is not a legal move) and return the new board.
+
+        Returns:
+            Board: A new board with the same pieces and the other color to move.
+        """
+        new_board = Board()
+        new_board.kings = dict.copy(self.kings)
+        new_board.knights = dict.copy(self.knights)
+        new_board.pawns = dict.copy(self.pawns)
+        new_board.bishops = dict.copy(self.bishops)
+        new_board.rooks = dict.copy(self.rooks)
+        new_board.queens = dict.copy(self.queens)
+        new_board.same_color = dict.copy(self.same_color)
+        new_board.all_pieces = np.copy(self.all_pieces)
+
+        # The en-passant capture is lost, and the positions before cannot be repeated through a null move
+        new_board.en_passant_square = {Color.WHITE: None, Color.BLACK: None}
+        new_board.hash = self.hash ^ zobrist.en_passant_key(self) ^ zobrist.SIDE_KEY
+        new_board.halfmove_clock = self.halfmove_clock + 1
+        new_board.fullmove_number = self.fullmove_number + (1 if self.color_turn == Color.BLACK else 0)
+        new_board.color_turn = Board.opposite_color(self.color_turn)
+
+        return new_board
     
 
 '''-------------------------------------------------------- Pieces move generation -----------------------------------------------------------------------------------'''
@@ -866,108 +983,107 @@ def leaves_in_check(board: Board, move: Move) -> bool:
 '''---------------------------------------------------------------- Meta data for a game -------------------------------------------------------------------------------'''
 '''-------------------------------------------------------------------------------------------------------------------------------------------------------------------'''
 
+def game_status(board: Board) -> GameStatus:
+    """ Get the state of the game: ongoing, or finished by checkmate, stalemate, insufficient material,
+    fifty-move rule or threefold repetition.
+
+    The legal moves are generated lazily and the search stops at the first one found.
+    The result is cached on the board (board.status) until a piece is set or cleared.
+
+    Parameters:
+        board(Board) : The current state of the Board
+
+    Returns:
+        GameStatus: The state of the game.
+    """
+    if board.status is not None:
+        return board.status
+
+    if is_insufficient_material(board):
+        board.status = GameStatus.INSUFFICIENT_MATERIAL
+    elif next(generate_legal_moves(board), None) is not None:
+        if board.halfmove_clock >= 100:
+            board.status = GameStatus.FIFTY_MOVES
+        elif board.repetition_count() >= 2:
+            board.status = GameStatus.REPETITION
+        else:
+            board.status = GameStatus.ONGOING
+    else:
+        king_square = Square(utils.lsb_bitscan(board.get_piece_bb(PieceType.KING)))
+        board.status = GameStatus.CHECKMATE if board.is_square_attacked(king_square) else GameStatus.STALEMATE
+
+    return board.status
+
 def is_game_over(board: Board) -> bool:
     """ Return True if the game is finished (a winner or a draw)
 
     Parameters:
         board(Board) : The current state of the Board
     """
-    return is_checkmate(board) or is_draw(board)
+    return game_status(board) != GameStatus.ONGOING
 
 def is_checkmate(board: Board) -> bool:
-    """ Check if there is no legal moves (meaning a checkmate)
+    """ Check if the current player is in check and has no legal moves
 
     Parameters:
         board(Board) : The current state of the Board
     """
-    return has_legal_moves(board)
+    return game_status(board) == GameStatus.CHECKMATE
 
 def is_stalemate(board: Board) -> bool:
-    """Check if the current player is not in check and has legal moves
+    """Check if the current player is not in check and has no legal moves
 
     Parameters:
         board(Board) : The current state of the board
     """
-    king_square = Square(utils.lsb_bitscan(board.get_piece_bb(PieceType.KING)))
-
-    if not board.is_square_attacked(king_square) and has_legal_moves(board):
-        return True
-    return False
+    return game_status(board) == GameStatus.STALEMATE
 
 def has_legal_moves(board: Board) -> bool:
-    """Check if the current board has any legal moves
+    """Check if the current board has any legal moves (stops at the first one found)
 
     Parameters:
         board(Board) : the current state of the board
     """
-    if list(generate_legal_moves(board)) == []:
-        return True
-    return False
+    return next(generate_legal_moves(board), None) is not None
 
 def is_insufficient_material(board: Board) -> bool:
     """
-    Check if there is insufficient material on the board for checkmate.
-    
+    Check if there is insufficient material on the board for checkmate:
+    king against king with at most one minor piece, or only bishops all on squares of the same color.
+
     Returns:
         bool: True if there is insufficient material, False otherwise.
     """
+    if (board.pawns[Color.WHITE] | board.pawns[Color.BLACK] | board.rooks[Color.WHITE] | board.rooks[Color.BLACK]
+            | board.queens[Color.WHITE] | board.queens[Color.BLACK]) != EMPTY_BB:
+        return False
 
-    is_queen_white = board.get_piece_bb(PieceType.QUEEN, Color.WHITE) != EMPTY_BB
-    is_queen_black = board.get_piece_bb(PieceType.QUEEN, Color.BLACK) != EMPTY_BB
-
-    is_knight_white = board.get_piece_bb(PieceType.KNIGHT, Color.WHITE) != EMPTY_BB
-    is_knight_black = board.get_piece_bb(PieceType.KNIGHT, Color.BLACK) != EMPTY_BB
-
-    is_bishop_white = board.get_piece_bb(PieceType.BISHOP, Color.WHITE) != EMPTY_BB
-    is_bishop_black = board.get_piece_bb(PieceType.BISHOP, Color.BLACK) != EMPTY_BB
-
-    is_rook_white = board.get_piece_bb(PieceType.ROOK, Color.WHITE) != EMPTY_BB
-    is_rook_black = board.get_piece_bb(PieceType.ROOK, Color.BLACK) != EMPTY_BB
-
-    is_pawn_white = board.get_piece_bb(PieceType.PAWN, Color.WHITE) != EMPTY_BB
-    is_pawn_black = board.get_piece_bb(PieceType.PAWN, Color.BLACK) != EMPTY_BB
-
-    nothing_except_black_king = (not is_queen_black and not is_knight_black and not is_bishop_black and not is_rook_black and not is_pawn_black)
-    nothing_except_white_king = (not is_queen_white and not is_knight_white and not is_bishop_white and not is_rook_white and not is_pawn_white)
-
-    only_black_bishop_king = (not is_queen_black and not is_knight_black and not is_rook_black and not is_pawn_black)
-    only_white_bishop_king = (not is_queen_white and not is_knight_white and not is_rook_white and not is_pawn_white)
-
-    only_black_knight_king = (not is_queen_black and not is_bishop_black and not is_rook_black and not is_pawn_black)
-    only_white_knight_king = (not is_queen_white and not is_bishop_white and not is_rook_white and not is_pawn_white)
+    knights = board.knights[Color.WHITE] | board.knights[Color.BLACK]
+    bishops = board.bishops[Color.WHITE] | board.bishops[Color.BLACK]
 
-    # Case King vs. king
-    if (nothing_except_black_king and nothing_except_white_king):
-        return True
-    
-    # King and bishop vs. king
-    if (nothing_except_black_king and only_white_bishop_king) or (nothing_except_white_king and only_black_bishop_king):
-        return True
-    
-    # King and knight vs. king
-    if (nothing_except_black_king and only_white_knight_king) or (nothing_except_white_king and only_black_knight_king):
+    if utils.population_count(knights | bishops) <= 1:
         return True
 
-    return False
-  
+    # Bishops only, all of them on light squares or all of them on dark squares
+    return knights == EMPTY_BB and ((bishops & LIGHT_SQUARES) == EMPTY_BB or (bishops & ~LIGHT_SQUARES) == EMPTY_BB)
+
 def is_draw(board: Board) -> bool:
     """Return True if the game is a draw
 
     Parameters:
         board(Board) : The current state of the board
     """
-    return is_stalemate(board) or is_insufficient_material(board)
+    return game_status(board) in (GameStatus.STALEMATE, GameStatus.INSUFFICIENT_MATERIAL,
+                                  GameStatus.FIFTY_MOVES, GameStatus.REPETITION)
 
 def get_outcome(board: Board):
-    """Return True if the game is a draw
+    """Return the color of the winner, or None if there is no winner (yet)
 
     Parameters:
         board(Board) : The current state of the board
     """
-    if list(generate_legal_moves(board)) == [] and board.color_turn == Color.WHITE:
-        return Color.BLACK
-    if list(generate_legal_moves(board)) == [] and board.color_turn == Color.BLACK:
-        return Color.WHITE
+    if game_status(board) == GameStatus.CHECKMATE:
+        return Board.opposite_color(board.color_turn)
     return None
 
 
@@ -4,66 +4,338 @@ chess_bot.py - Multiple Bot playing chess implementation
 You can find:
     - Random bot (taking random moves)
     - MTCS bot (using monte carlo tree search to make decision)
+    - Minmax and MTCS players keeping their search between their moves and pondering on the opponent's time
 """
 
 from board import *
 from mtcs import *
 from minmax import *
+import math
 import random
+import threading
 
-def random_bot(board: Board) -> Board:
-    """ Random bot making a random move
+def random_move(board: Board) -> Move:
+    """ Choose a random legal move
 
     Parameters:
         board(Board) : Current state of the board
 
     Return:
-        Board : The new board after the random bot move
+        Move : The chosen move
     """
 
     # Generate all the possible moves
     possible_moves = list(generate_legal_moves(board))
 
     # Choose a random move among all the possible moves
-    move = random.choice(possible_moves)
+    return random.choice(possible_moves)
+
+
+def minmax_move(board: Board, depth: int = 3) -> Move:
+    """ Choose a move using min-max algorithm
+
+    Parameters:
+        board(Board) : Current state of the board
+        depth(int) : Depth of the search
+
+    Return:
+        Move : The chosen move
+    """
 
-    return board.apply_move(move=move)
+    return best_move(board, depth)
 
 
-def minmax_bot(board: Board) -> Board:
+def mtcs_move(board: Board, time_limit: float = 15, verbose: bool = True) -> Move:
+    """ Choose a move using monte carlo tree search algorithm
+
+    Parameters:
+        board(Board) : Current state of the board
+        time_limit(float) : Time of the search in seconds
+        verbose(bool) : Print the statistics of the search
+
+    Return:
+        Move : The chosen move
+    """
+
+    # Construct the monte carlo search with a time limit of search 
+    mcts = MTCS(state=board)
+    mcts.mtcs_search(time_limit)
+
+    # Get and print the statistics
+    if verbose:
+        num_rollouts, run_time = mcts.statistics()
+        print("Statistics: ", num_rollouts, "rollouts in", run_time, "seconds")
+
+    # Choose the best move to do
+    return mcts.choose_best_move()
+
+
+def random_bot(board: Board) -> Board:
+    """ Random bot making a random move
+
+    Parameters:
+        board(Board) : Current state of the board
+
+    Return:
+        Board : The new board after the random bot move
+    """
+
+    return board.apply_move(move=random_move(board))
+
+
+def minmax_bot(board: Board, depth: int = 3) -> Board:
     """ Minmax bot making a move using min-max algorithm
 
     Parameters:
         board(Board) : Current state of the board
+        depth(int) : Depth of the search
     
     Return:
         Board : The new board afther the min max bot move
     """
 
-    mv = best_move(board, 3)
-    return board.apply_move(move=mv)
+    return board.apply_move(move=minmax_move(board, depth))
 
 
-def mtcs_bot(board: Board) -> Board:
+def mtcs_bot(board: Board, time_limit: float = 15, verbose: bool = True) -> Board:
     """ MTCS bot making a move using monte carlo tree search algorithm
 
     Parameters:
         board(Board) : Current state of the board
+        time_limit(float) : Time of the search in seconds
+        verbose(bool) : Print the statistics of the search
     
     Return:
         Board : The new board afther the MTCS bot move
     """
 
-    # Construct the monte carlo search with a time limit of search 
-    mcts = MTCS(state=board)
-    mcts.mtcs_search(15)
+    return board.apply_move(move=mtcs_move(board, time_limit, verbose))
 
-    # Get and print the statistics
-    num_rollouts, run_time = mcts.statistics()
-    print("Statistics: ", num_rollouts, "rollouts in", run_time, "seconds")
 
-    # Choose the best move to do
-    best_move = mcts.choose_best_move()
-    
-    return board.apply_move(move=best_move)
+class MinmaxPlayer:
+    """ Minmax bot keeping its search (and its transposition table) between its moves and pondering:
+    after its move, it searches in a background thread the position after the answer it expects.
+    If the opponent plays this answer (ponder hit), the same search goes on until the depth (or the time limit)
+    is reached. Otherwise it is stopped and the real position is searched, with the table filled while pondering.
+    """
+
+    def __init__(self, depth: int = 3, time_limit: float = None, ponder: bool = True):
+        """
+        Parameters:
+            depth(int) : Depth of the search, None to only use the time limit
+            time_limit(float) : Time of the search in seconds, None for no limit
+            ponder(bool) : Search on the opponent's time
+
+        Raises:
+            ValueError : If neither the depth nor the time limit is given
+        """
+        if depth is None and time_limit is None:
+            raise ValueError("The search needs a depth or a time limit")
+
+        self.depth = depth
+        self.time_limit = time_limit
+        self.ponder = ponder
+        self.search = Search()
+        self.thread = None
+        self.ponder_move = None  # Answer expected from the opponent
+        self.ponder_board = None  # Position searched while pondering
+        self.ponder_result = None  # (move, score, depth) of the pondering search once it ends
+        self.depth_reached = threading.Event()  # Set when the pondering search has completed the depth
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    def __call__(self, board: Board) -> Board:
+        """ Play a move, like minmax_bot
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            Board : The new board after the move
+        """
+        return board.apply_move(move=self.move(board))
+
+    def move(self, board: Board) -> Move:
+        """ Choose a move, using the pondering search on a ponder hit, and start pondering the expected answer
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            Move : The chosen move
+        """
+        result = self.finish_ponder(board)
+        if result is None:
+            result = iterative_deepening(board, self.depth, self.time_limit, self.search)
+
+        move = result[0]
+        if self.ponder and move is not None:
+            self.start_ponder(board.apply_move(move))
+        return move
+
+    def start_ponder(self, board: Board) -> None:
+        """ Search in the background the position after the expected answer (the second move of the variation)
+
+        Parameters:
+            board(Board) : The board after the move of the player
+        """
+        pv = self.search.principal_variation
+        if len(pv) < 2:
+            return
+        ponder_board = board.apply_move(pv[1])
+        if is_game_over(ponder_board):
+            return
+
+        self.ponder_move = pv[1]
+        self.ponder_board = ponder_board
+        self.ponder_result = None
+        self.depth_reached.clear()
+        # Set before the thread starts, so a ponder hit cannot be lost
+        self.search.pondering = True
+        self.thread = threading.Thread(target=self.run_ponder, args=(ponder_board,), daemon=True)
+        self.thread.start()
+
+    def run_ponder(self, board: Board) -> None:
+        """ Pondering search (in the background thread), without depth limit until stopped
+        """
+        def info(depth, score, move, search):
+            if self.depth is not None and depth >= self.depth:
+                self.depth_reached.set()
+
+        self.ponder_result = iterative_deepening(board, None, self.time_limit, self.search, info)
+        self.depth_reached.set()
+
+    def finish_ponder(self, board: Board):
+        """ End the pondering search when the opponent has played
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            tuple : The result of the pondering search on a ponder hit, None otherwise
+        """
+        if self.thread is None:
+            return None
+
+        hit = board.hash == self.ponder_board.hash
+        if hit:
+            self.ponder_hits += 1
+            # The time limit starts now, and the depth may already be reached
+            self.search.ponderhit()
+            if self.depth is not None:
+                self.depth_reached.wait()
+                self.search.stop()
+        else:
+            self.ponder_misses += 1
+            self.search.stop()
+
+        self.thread.join()
+        self.thread = None
+        self.search.pondering = False
+        return self.ponder_result if hit else None
+
+    def stop(self) -> None:
+        """ Stop pondering (e.g. at the end of the game)
+        """
+        if self.thread is not None:
+            self.search.stop()
+            self.thread.join()
+            self.thread = None
+            self.search.pondering = False
+
+    def new_game(self) -> None:
+        """ Stop pondering and forget the positions of the previous game
+        """
+        self.stop()
+        self.search.tt.clear()
+
+
+class MTCSPlayer:
+    """ MTCS bot keeping its tree between its moves and pondering: after its move, the search goes on from the new
+    position while the opponent thinks (it explores all the answers). When the opponent has played, the subtree of
+    the answer becomes the root of the next search, with the rollouts already done in it.
+    """
+
+    def __init__(self, time_limit: float = 15, ponder: bool = True, verbose: bool = False,
+                 mcts_class=TranspositionMTCS):
+        """
+        Parameters:
+            time_limit(float) : Time of the search in seconds
+            ponder(bool) : Search on the opponent's time
+            verbose(bool) : Print the statistics of each search
+            mcts_class : The monte carlo tree search used (MTCS, TranspositionMTCS or BatchedMTCS)
+        """
+        self.time_limit = time_limit
+        self.ponder = ponder
+        self.verbose = verbose
+        self.mcts_class = mcts_class
+        self.mcts = None
+        self.thread = None
+        self.reused_trees = 0
+
+    def __call__(self, board: Board) -> Board:
+        """ Play a move, like mtcs_bot
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            Board : The new board after the move
+        """
+        return board.apply_move(move=self.move(board))
+
+    def move(self, board: Board) -> Move:
+        """ Choose a move from the tree kept since the last move, and start pondering
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            Move : The chosen move
+        """
+        self.stop()
+        if self.mcts is not None and self.follow(board):
+            self.reused_trees += 1
+        else:
+            self.mcts = self.mcts_class(board)
+
+        self.mcts.mtcs_search(self.time_limit)
+        if self.verbose:
+            num_rollouts, run_time = self.mcts.statistics()
+            print("Statistics: ", num_rollouts, "rollouts in", run_time, "seconds")
+
+        move = self.mcts.choose_best_move()
+        if move is not None:
+            self.mcts.move(move)
+            if self.ponder and not is_game_over(self.mcts.root_state):
+                self.thread = threading.Thread(target=self.mcts.mtcs_search, args=(math.inf,), daemon=True)
+                self.thread.start()
+        return move
+
+    def follow(self, board: Board) -> bool:
+        """ Move the root of the tree to the board, if it is the root position or follows it by one move
+
+        Parameters:
+            board(Board) : Current state of the board
+
+        Return:
+            bool : True if the tree has been kept
+        """
+        root_state = self.mcts.root_state
+        if root_state.hash == board.hash:
+            return True
+        for move in generate_legal_moves(root_state):
+            if root_state.apply_move(move).hash == board.hash:
+                self.mcts.move(move)
+                return True
+        return False
 
+    def stop(self) -> None:
+        """ Stop pondering (e.g. at the end of the game)
+        """
+        if self.thread is not None:
+            self.mcts.stop()
+            self.thread.join()
+            self.thread = None
+        if self.mcts is not None:
+            self.mcts.stop_event.clear()
@@ -7,6 +7,8 @@ This file defines various enumerations used in a chess implementation.
 - Color: Enumeration representing the color of a chess piece.
 - Rank: Enumeration representing the ranks (rows) on a chessboard.
 - File: Enumeration representing the files (columns) on a chessboard.
+- GameStatus: Enumeration representing the state of a game (ongoing or finished and how).
+- Bound: Enumeration representing the kind of score stored in the transposition table.
 """
 
 from enum import IntEnum
@@ -93,3 +95,18 @@ class File(IntEnum):
     F = 5
     G = 6
     H = 7
+
+class GameStatus(IntEnum):
+    """Enumeration representing the state of a game."""
+    ONGOING = 0
+    CHECKMATE = 1
+    STALEMATE = 2
+    INSUFFICIENT_MATERIAL = 3
+    FIFTY_MOVES = 4
+    REPETITION = 5
+
+class Bound(IntEnum):
+    """Enumeration representing how a score stored in the transposition table relates to the real score."""
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
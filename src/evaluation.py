@@ -44,6 +44,163 @@ def eval_pieces(board):
 def eval_moves(board):
     num = len(list(generate_legal_moves(board)))
     if num == 0:
-        return Heuristic.CHECKMATE.value
+        # A stalemate is a draw: the material is cancelled
+        return Heuristic.CHECKMATE.value if board.is_in_check() else -eval_pieces(board)
     else:
-        return Heuristic.MOVE.value * np.int32(num)
\ No newline at end of file
+        return Heuristic.MOVE.value * np.int32(num)
+
+'''------------------------------------------------------------ Vectorized evaluation ------------------------------------------------------------------------------'''
+'''-------------------------------------------------------------------------------------------------------------------------------------------------------------------'''
+
+# Piece values indexed by PieceType (the king is not counted in the material)
+PIECE_VALUES = np.array([Heuristic.PAWN.value, Heuristic.KNIGHT.value, Heuristic.BISHOP.value,
+                         Heuristic.ROOK.value, Heuristic.QUEEN.value, 0], dtype=np.float64)
+
+# Piece-square tables in centipawns, seen by white, written from a8 (top left) to h1 (bottom right)
+_PST_TABLES = [
+    [  0,   0,   0,   0,   0,   0,   0,   0,
+      50,  50,  50,  50,  50,  50,  50,  50,
+      10,  10,  20,  30,  30,  20,  10,  10,
+       5,   5,  10,  25,  25,  10,   5,   5,
+       0,   0,   0,  20,  20,   0,   0,   0,
+       5,  -5, -10,   0,   0, -10,  -5,   5,
+       5,  10,  10, -20, -20,  10,  10,   5,
+       0,   0,   0,   0,   0,   0,   0,   0],
+    [-50, -40, -30, -30, -30, -30, -40, -50,
+     -40, -20,   0,   0,   0,   0, -20, -40,
+     -30,   0,  10,  15,  15,  10,   0, -30,
+     -30,   5,  15,  20,  20,  15,   5, -30,
+     -30,   0,  15,  20,  20,  15,   0, -30,
+     -30,   5,  10,  15,  15,  10,   5, -30,
+     -40, -20,   0,   5,   5,   0, -20, -40,
+     -50, -40, -30, -30, -30, -30, -40, -50],
+    [-20, -10, -10, -10, -10, -10, -10, -20,
+     -10,   0,   0,   0,   0,   0,   0, -10,
+     -10,   0,   5,  10,  10,   5,   0, -10,
+     -10,   5,   5,  10,  10,   5,   5, -10,
+     -10,   0,  10,  10,  10,  10,   0, -10,
+     -10,  10,  10,  10,  10,  10,  10, -10,
+     -10,   5,   0,   0,   0,   0,   5, -10,
+     -20, -10, -10, -10, -10, -10, -10, -20],
+    [  0,   0,   0,   0,   0,   0,   0,   0,
+       5,  10,  10,  10,  10,  10,  10,   5,
+      -5,   0,   0,   0,   0,   0,   0,  -5,
+      -5,   0,   0,   0,   0,   0,   0,  -5,
+      -5,   0,   0,   0,   0,   0,   0,  -5,
+      -5,   0,   0,   0,   0,   0,   0,  -5,
+      -5,   0,   0,   0,   0,   0,   0,  -5,
+       0,   0,   0,   5,   5,   0,   0,   0],
+    [-20, -10, -10,  -5,  -5, -10, -10, -20,
+     -10,   0,   0,   0,   0,   0,   0, -10,
+     -10,   0,   5,   5,   5,   5,   0, -10,
+      -5,   0,   5,   5,   5,   5,   0,  -5,
+       0,   0,   5,   5,   5,   5,   0,  -5,
+     -10,   5,   5,   5,   5,   5,   0, -10,
+     -10,   0,   5,   0,   0,   0,   0, -10,
+     -20, -10, -10,  -5,  -5, -10, -10, -20],
+    [-30, -40, -40, -50, -50, -40, -40, -30,
+     -30, -40, -40, -50, -50, -40, -40, -30,
+     -30, -40, -40, -50, -50, -40, -40, -30,
+     -30, -40, -40, -50, -50, -40, -40, -30,
+     -20, -30, -30, -40, -40, -30, -30, -20,
+     -10, -20, -20, -20, -20, -20, -20, -10,
+      20,  20,   0,   0,   0,   0,  20,  20,
+      20,  30,  10,   0,   0,  10,  30,  20],
+]
+
+# PIECE_SQUARE_TABLES[color][piece][square] in pawn units (a1 = 0), black tables are the vertical mirror of white ones
+_WHITE_PST = np.array(_PST_TABLES, dtype=np.float64).reshape(6, 8, 8)[:, ::-1, :].reshape(6, 64) / 100
+PIECE_SQUARE_TABLES = np.stack([_WHITE_PST, _WHITE_PST[:, np.arange(64) ^ 56]])
+
+_NOT_FILE_A = ~FILES[File.A]
+_NOT_FILE_H = ~FILES[File.H]
+
+# Sliding directions as (shift, left shift or not, mask removing the squares wrapped around the board)
+_ROOK_DIRECTIONS = [(np.uint64(8), True, ~EMPTY_BB), (np.uint64(8), False, ~EMPTY_BB),
+                    (np.uint64(1), True, _NOT_FILE_A), (np.uint64(1), False, _NOT_FILE_H)]
+_BISHOP_DIRECTIONS = [(np.uint64(9), True, _NOT_FILE_A), (np.uint64(7), True, _NOT_FILE_H),
+                      (np.uint64(7), False, _NOT_FILE_A), (np.uint64(9), False, _NOT_FILE_H)]
+
+
+def _sliding_attacks(sliders: np.ndarray, empty: np.ndarray, directions: list) -> np.ndarray:
+    """
+    Compute the attacks of sliding pieces for arrays of bitboards (Kogge-Stone occluded fill).
+
+    Parameters:
+        sliders (np.ndarray): Bitboards of the sliding pieces.
+        empty (np.ndarray): Bitboards of the empty squares (broadcastable to sliders).
+        directions (list): The directions the pieces slide to.
+
+    Returns:
+        np.ndarray: Bitboards of the attacked squares.
+    """
+    attacks = np.zeros_like(sliders)
+    for shift, left, mask in directions:
+        step = (lambda bb, n: bb << n) if left else (lambda bb, n: bb >> n)
+        gen = sliders
+        pro = empty & mask
+        gen = gen | (pro & step(gen, shift))
+        pro = pro & step(pro, shift)
+        gen = gen | (pro & step(gen, shift * np.uint64(2)))
+        pro = pro & step(pro, shift * np.uint64(2))
+        gen = gen | (pro & step(gen, shift * np.uint64(4)))
+        attacks |= mask & step(gen, shift)
+    return attacks
+
+
+def _unpack_squares(bitboards: np.ndarray) -> np.ndarray:
+    """
+    Unpack an array of bitboards into one 0/1 value per square (last axis of size 64, a1 = 0).
+    """
+    as_bytes = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8)
+    return np.unpackbits(as_bytes.reshape(bitboards.shape + (8,)), axis=-1, bitorder='little')
+
+
+def mobility_batch(bitboards: np.ndarray) -> np.ndarray:
+    """
+    Count the pseudo-legal moves of the knights, bishops, rooks, queens and king of both colors.
+
+    Parameters:
+        bitboards (np.ndarray): Array of shape (K, 2, 6) of piece bitboards (see Board.bitboards).
+
+    Returns:
+        np.ndarray: Array of shape (K, 2) with the number of moves of each color.
+    """
+    own = np.bitwise_or.reduce(bitboards, axis=2)
+    empty = ~(own[:, 0] | own[:, 1])
+    squares = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+    # One bitboard per (position, color, square) holding the piece of this square if any
+    knights = bitboards[:, :, PieceType.KNIGHT, None] & squares
+    kings = bitboards[:, :, PieceType.KING, None] & squares
+    diagonals = (bitboards[:, :, PieceType.BISHOP, None] | bitboards[:, :, PieceType.QUEEN, None]) & squares
+    lines = (bitboards[:, :, PieceType.ROOK, None] | bitboards[:, :, PieceType.QUEEN, None]) & squares
+
+    empty = empty[:, None, None]
+    attacks = (np.where(knights != EMPTY_BB, KNIGHT_MOVES, EMPTY_BB)
+               | np.where(kings != EMPTY_BB, KING_MOVES, EMPTY_BB))
+    moves = utils.population_count(attacks & ~own[:, :, None]).astype(np.int32)
+    moves += utils.population_count(_sliding_attacks(diagonals, empty, _BISHOP_DIRECTIONS) & ~own[:, :, None])
+    moves += utils.population_count(_sliding_attacks(lines, empty, _ROOK_DIRECTIONS) & ~own[:, :, None])
+    return moves.sum(axis=2)
+
+
+def evaluate_batch(bitboards: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """
+    Evaluate K positions at once with material, piece-square tables and mobility.
+
+    Parameters:
+        bitboards (np.ndarray): Array of shape (K, 2, 6) of piece bitboards (see Board.bitboards).
+        colors (np.ndarray): Array of shape (K,) with the color to move in each position.
+
+    Returns:
+        np.ndarray: Array of shape (K,) with the score of each position for the color to move.
+    """
+    squares = _unpack_squares(bitboards)
+
+    material = squares.sum(axis=3) @ PIECE_VALUES
+    placement = np.einsum('kcps,cps->kc', squares, PIECE_SQUARE_TABLES)
+    mobility = Heuristic.MOVE.value * mobility_batch(bitboards)
+
+    white_score = (material + placement + mobility) @ np.array([1, -1])
+    return np.where(np.asarray(colors) == Color.WHITE, white_score, -white_score)
@@ -3,11 +3,13 @@ from board import *
 from button import Button
 import sys
 from chess_bot import *
+from pgn import Game, write_game, move_between
 
 WIDTH = HEIGHT = 512
 DIMENSION = 8
 SQ_SIZE = HEIGHT // DIMENSION
 MAX_FPS = 15
+PGN_FILE = "games.pgn" # The finished games are appended to this file
 IMAGES = {}
 
 p.init()
@@ -127,18 +129,42 @@ def play(config):
     dragging = False
     x, y = 0, 0  # Initialize x and y outside the event loop
 
+    # The minmax bot keeps its transposition table between its moves and ponders while the opponent thinks
+    minmax_player = MinmaxPlayer()
+
+    # Record of the game, saved in PGN when it ends
+    if config == None:
+        players = ("random", "minmax")
+    else:
+        players = (config[0], "player") if config[1] == Color.WHITE else ("player", config[0])
+    game = Game({"Event": "Kaspich game", "White": players[0], "Black": players[1]})
+    game_saved = False
+
     running = True
     while running:
+        previous_board = board
         for e in p.event.get():
             if e.type == p.QUIT:
+                minmax_player.stop()
                 p.quit()
                 sys.exit()
         
-        if config == None: # CASE IA VS IA
+        if is_game_over(board): # The game is finished, only draw the final position
+            minmax_player.stop()
+            if not game_saved:
+                status = game_status(board)
+                if status == GameStatus.CHECKMATE:
+                    game.result = "0-1" if board.color_turn == Color.WHITE else "1-0"
+                else:
+                    game.result = "1/2-1/2"
+                with open(PGN_FILE, "a") as file:
+                    write_game(file, game)
+                game_saved = True
+        elif config == None: # CASE IA VS IA
             if board.color_turn == Color.WHITE:
                 board = random_bot(board=board)
             else:
-                board = minmax_bot(board=board)
+                board = minmax_player(board)
         elif config[0] == "random": # CASE PLAYER VS RANDOM IA
             if board.color_turn == config[1]:
                 board = random_bot(board=board)
@@ -155,7 +181,7 @@ def play(config):
                         y = location[1] - SQ_SIZE // 2
         else: # CASE PLAYER VS minmax IA
             if board.color_turn == config[1]:
-                board = minmax_bot(board=board)
+                board = minmax_player(board)
             else:
                 if e.type == p.MOUSEBUTTONDOWN:
                     location = p.mouse.get_pos()
@@ -167,7 +193,12 @@ def play(config):
                         location = p.mouse.get_pos()
                         x = location[0] - SQ_SIZE // 2
                         y = location[1] - SQ_SIZE // 2
-            
+
+        if board is not previous_board:
+            move = move_between(previous_board, board)
+            if move is not None:
+                game.moves.append(move)
+
         draw_game_state(screen=SCREEN, board=board)
         if dragging:
             if selected_piece != None:
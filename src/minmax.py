@@ -1,7 +1,187 @@
 from board import *
 from evaluation import *
+from transposition import TranspositionTable
+from search_stats import SearchStats
+from enums import Bound
+import logging
+import threading
+import time
 
-def minimax(board, depth, alpha, beta):
+logger = logging.getLogger(__name__)
+
+# Maximum depth reached by the iterative deepening when no depth is given
+MAX_DEPTH = 64
+
+# Maximum distance from the root of a node, size of the principal variation table
+MAX_PLY = 128
+
+# Score bound of the search (above any evaluation)
+INFINITY = 1000000
+
+# Score of a checkmate: being mated n plies from the root scores -MATE_SCORE + n, so the faster mates score higher.
+# The scores beyond MATE_BOUND are mates
+MATE_SCORE = -Heuristic.CHECKMATE.value
+MATE_BOUND = MATE_SCORE - MAX_PLY
+
+# Half width of the first aspiration window (in pawns), doubled at each failure, and the first depth searched with one
+# (the shallow iterations are too cheap for the failed searches to pay off). The window is centred on the score of the
+# iteration two plies shallower: the score swings between odd and even depths, as the evaluation favours the side
+# to move
+ASPIRATION_WINDOW = 0.5
+ASPIRATION_DEPTH = 5
+
+# Null-move pruning: first depth where it is tried, depth reduction of the null move search (one more from
+# NULL_MOVE_DEEP_DEPTH) and first depth where a null move cutoff is verified by a reduced search
+NULL_MOVE_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_DEEP_DEPTH = 7
+NULL_MOVE_VERIFY_DEPTH = 6
+
+# Late move reductions: first depth where they are applied, number of moves searched at full depth before reducing,
+# and number of moves after which the reduction is 2 plies
+LMR_DEPTH = 3
+LMR_FULL_DEPTH_MOVES = 3
+LMR_DEEP_MOVES = 6
+
+# Width of the windows of the scout searches (in pawns, below the centipawn precision of the evaluation)
+NULL_WINDOW = 0.001
+
+# Value of the captured pieces to order the captures (most valuable victim first), indexed by PieceType
+VICTIM_VALUES = [1, 3, 3, 5, 9, 0]
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when it has been asked to stop (stop command or time limit)."""
+    pass
+
+
+class Search:
+    def __init__(self, tt_size: int = 1 << 20, stats: SearchStats = None):
+        """
+        State shared by all the nodes of a search and kept between searches.
+
+        Parameters:
+            tt_size (int): Maximum number of positions in the transposition table.
+            stats (SearchStats): Statistics filled by the search, None to not collect them.
+        """
+        self.tt = TranspositionTable(tt_size)
+        self.stats = stats
+        self.root_depth = MAX_DEPTH  # Depth of the current root search, which bounds the check extensions
+        self.pv_table = [[] for _ in range(MAX_PLY + 1)]  # Best line found from the node searched at each ply
+        self.principal_variation = []  # Best line of the last completed root search
+        self.stop_event = threading.Event()  # Set from another thread to stop the search
+        self.deadline = None  # time.time() after which the search stops, None for no limit
+        self.time_limit = None  # Time given to the search, counted from the ponder hit when pondering
+        self.pondering = False  # The search runs on the opponent's time, without deadline until the ponder hit
+        self.lock = threading.Lock()
+        self.nodes = 0
+        self.start_time = time.time()
+
+    def start(self, time_limit: float = None) -> None:
+        """
+        Reset the counters and the stop flag before a new search (the transposition table is kept).
+        When pondering, the time limit only starts at the ponder hit.
+
+        Parameters:
+            time_limit (float): Time in seconds given to the search, None for no limit.
+        """
+        with self.lock:
+            self.stop_event.clear()
+            self.nodes = 0
+            self.start_time = time.time()
+            self.time_limit = time_limit
+            self.deadline = None if time_limit is None or self.pondering else self.start_time + time_limit
+
+    def ponderhit(self) -> None:
+        """
+        The opponent played the expected move: the pondering search goes on as a normal search,
+        with its time limit counted from now.
+        """
+        with self.lock:
+            self.pondering = False
+            if self.time_limit is not None:
+                self.deadline = time.time() + self.time_limit
+
+    def stop(self) -> None:
+        """
+        Ask the search to stop as soon as possible.
+        """
+        self.stop_event.set()
+
+    def should_stop(self) -> bool:
+        """
+        Check if the search has been stopped or has run out of time.
+        """
+        return self.stop_event.is_set() or (self.deadline is not None and time.time() >= self.deadline)
+
+    def elapsed(self) -> float:
+        """
+        Time in seconds since the start of the search.
+        """
+        return time.time() - self.start_time
+
+
+def score_to_tt(score, ply):
+    """
+    Convert a mate score from the distance to the root to the distance to the node, to store it in the
+    transposition table (the same position can be reached at other plies).
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """
+    Convert a mate score of the transposition table from the distance to the node to the distance to the root.
+    """
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def mate_in(score):
+    """
+    Get the number of moves before the mate of a score: positive if the side to move mates, negative if it is mated,
+    None if the score is not a mate.
+    """
+    if score >= MATE_BOUND:
+        return int((MATE_SCORE - score + 1) // 2)
+    if score <= -MATE_BOUND:
+        return -int((MATE_SCORE + score) // 2)
+    return None
+
+
+def order_moves(board, moves, tt_move=None):
+    """
+    Order the moves to search the most promising ones first: the move of the transposition table,
+    then the captures (most valuable victim first), then the other moves.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        moves (iterable): The legal moves of the board.
+        tt_move (Move): The best move stored in the transposition table, if any.
+
+    Returns:
+        list: The ordered moves.
+    """
+    opponent = board.same_color[Board.opposite_color(board.color_turn)]
+
+    def priority(move):
+        if tt_move is not None and move == tt_move and move.promo == tt_move.promo:
+            return -100
+        if utils.is_set(opponent, move.dest):
+            return -VICTIM_VALUES[board.piece_on(move.dest, Board.opposite_color(board.color_turn))]
+        return 0
+
+    return sorted(moves, key=priority)
+
+
+def minimax(board, depth, alpha, beta, search=None, ply=1, null_move=True):
     """
     Minimax algorithm with alpha-beta pruning to find the best move using recursive search.
 
@@ -10,46 +190,454 @@ def minimax(board, depth, alpha, beta):
         depth (int): The remaining depth of the search.
         alpha (float): The best score that the maximizing player can achieve.
         beta (float): The best score that the minimizing player can achieve.
+        search (Search): The state of the search (transposition table, stop flag), a new one if not given.
+        ply (int): The distance from the root of the search.
+        null_move (bool): False to not try a null move (after a null move and in its verification).
 
     Returns:
         float: The estimated score of the best move for the current player.
+
+    Raises:
+        SearchStopped: If the search has been stopped or has run out of time.
     """
-    if depth == 0:
+    if search is None:
+        search = Search()
+
+    stats = search.stats
+    search.pv_table[ply] = []
+
+    search.nodes += 1
+    if stats is not None:
+        stats.count("nodes", ply)
+    if search.should_stop():
+        raise SearchStopped()
+
+    # A repeated position or the fifty-move rule is a draw, there is no need to search it
+    if board.halfmove_clock >= 100 or board.is_repetition():
+        return 0
+
+    # A node of the principal variation is searched with an open window, the other ones with a null window
+    pv_node = beta - alpha > NULL_WINDOW
+
+    # Mate distance pruning: no line from here can mate faster than a mate in this node's child, or be mated slower
+    # than a mate in this node, so the search stops if a mate already found is better
+    alpha = max(alpha, -MATE_SCORE + ply)
+    beta = min(beta, MATE_SCORE - ply - 1)
+    if alpha >= beta:
+        return alpha
+
+    # Check extension: a position in check is searched one ply deeper (the line may be forced), up to twice the depth
+    # of the root search
+    in_check = board.is_in_check()
+    if in_check and ply < 2 * search.root_depth:
+        depth += 1
+
+    if depth == 0 or ply >= MAX_PLY:
+        if stats is not None:
+            stats.count("eval_calls", ply)
         return evaluate(board)
-    
-    for move in generate_legal_moves(board):
+
+    # Reuse the score of the transposition table if it was searched deep enough (not on the principal variation,
+    # which would be cut)
+    key = int(board.hash)
+    entry = search.tt.probe(key)
+    if stats is not None:
+        stats.count("tt_probes", ply)
+    tt_move = None
+    if entry is not None:
+        if stats is not None:
+            stats.count("tt_hits", ply)
+        tt_depth, tt_score, tt_bound, tt_move = entry
+        tt_score = score_from_tt(tt_score, ply)
+        if tt_depth >= depth and not pv_node:
+            if (tt_bound == Bound.EXACT
+                    or (tt_bound == Bound.LOWER and tt_score >= beta)
+                    or (tt_bound == Bound.UPPER and tt_score <= alpha)):
+                if stats is not None:
+                    stats.count("tt_cutoffs", ply)
+                return tt_score
+
+    # Null move: if passing the turn still fails high with a reduced search, a real move would too. This is wrong in
+    # zugzwang, so it is not tried without pieces (pawn endgames), and deep cutoffs are verified by a reduced search
+    if (null_move and not pv_node and depth >= NULL_MOVE_DEPTH and not in_check and beta < MATE_BOUND
+            and board.has_non_pawn_material()):
+        reduction = NULL_MOVE_REDUCTION + (1 if depth >= NULL_MOVE_DEEP_DEPTH else 0)
+        score = -minimax(board.apply_null_move(), max(depth - 1 - reduction, 0), -beta, -beta + NULL_WINDOW,
+                         search, ply + 1, False)
+        if score >= beta and depth >= NULL_MOVE_VERIFY_DEPTH:
+            score = minimax(board, depth - reduction, beta - NULL_WINDOW, beta, search, ply, False)
+        if score >= beta:
+            if stats is not None:
+                stats.count("null_move_cutoffs", ply)
+            return beta
+
+    original_alpha = alpha
+    best = None
+    opponent = board.same_color[Board.opposite_color(board.color_turn)]
+    has_moves = False
+
+    for index, move in enumerate(order_moves(board, generate_legal_moves(board), tt_move)):
+        has_moves = True
         new_board = board.apply_move(move)
-        score = -minimax(new_board, depth - 1, -beta, -alpha)
-        
+
+        # Late moves (ordered after the transposition table move and the captures) are searched with a reduced depth,
+        # unless they are captures, promotions or checks, and searched again at full depth if they beat alpha
+        reduction = 0
+        if (depth >= LMR_DEPTH and index >= LMR_FULL_DEPTH_MOVES and not in_check and move.promo is None
+                and not move.en_passant and not utils.is_set(opponent, move.dest) and not new_board.is_in_check()):
+            reduction = 1 if index < LMR_DEEP_MOVES else 2
+
+        if reduction:
+            if stats is not None:
+                stats.count("lmr_reductions", ply)
+            score = -minimax(new_board, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha, search, ply + 1)
+            if score > alpha:
+                if stats is not None:
+                    stats.count("lmr_researches", ply)
+                score = pvs(new_board, depth - 1, alpha, beta, search, ply + 1, False)
+        else:
+            score = pvs(new_board, depth - 1, alpha, beta, search, ply + 1, index == 0)
+
         # Update alpha with the maximum score found so far
-        alpha = max(alpha, score)
-        
+        if score > alpha:
+            alpha = score
+            best = move
+            search.pv_table[ply] = [move] + search.pv_table[ply + 1]
+
         # Prune the search if beta <= alpha (cut-off condition)
         if beta <= alpha:
+            if stats is not None:
+                stats.count("beta_cutoffs", ply)
+                if index == 0:
+                    stats.count("first_move_cutoffs", ply)
             break
-        
+
+    # No legal move: checkmate (scored by its distance to the root) or stalemate
+    if not has_moves:
+        return -MATE_SCORE + ply if in_check else 0
+
+    if alpha <= original_alpha:
+        bound = Bound.UPPER
+    elif alpha >= beta:
+        bound = Bound.LOWER
+    else:
+        bound = Bound.EXACT
+    search.tt.store(key, depth, score_to_tt(alpha, ply), bound, best)
+
     return alpha
 
 
-def best_move(board, depth):
+def pvs(board, depth, alpha, beta, search, ply, first):
     """
-    Find the best move using the minimax algorithm with alpha-beta pruning.
+    Principal variation search of a child: the first move is searched with the full window, the next ones with a
+    null window only proving they are not better than alpha, and searched again with the full window if they are.
+
+    Parameters:
+        board (Board): The state of the game board after the move.
+        depth (int): The remaining depth of the search.
+        alpha (float): The best score of the parent so far.
+        beta (float): The score above which the parent is cut.
+        search (Search): The state of the search.
+        ply (int): The distance of the child from the root.
+        first (bool): True for the first move of the parent.
+
+    Returns:
+        float: The score of the move for the parent.
+    """
+    if first:
+        return -minimax(board, depth, -beta, -alpha, search, ply)
+
+    score = -minimax(board, depth, -alpha - NULL_WINDOW, -alpha, search, ply)
+    if alpha < score < beta:
+        if search.stats is not None:
+            search.stats.count("pvs_researches", ply - 1)
+        score = -minimax(board, depth, -beta, -alpha, search, ply)
+    return score
+
+
+def search_root(board, depth, search=None, alpha=-INFINITY, beta=INFINITY, excluded=()):
+    """
+    Search all the moves of the root position to the given depth.
 
     Parameters:
         board (Board): The current state of the game board.
         depth (int): The depth of the search.
+        search (Search): The state of the search, a new one if not given.
+        alpha (float): Lower bound of the window, the score is only an upper bound if it is not above it.
+        beta (float): Upper bound of the window, the score is only a lower bound if it is not below it.
+        excluded (tuple): Root moves not searched (the best moves of the previous lines in multi-PV analysis).
 
     Returns:
-        Move: The best move to make based on the minimax search.
+        tuple: The score of the best move and the best move (None if there is no legal move left).
+               The best line is kept in search.principal_variation.
+
+    Raises:
+        SearchStopped: If the search has been stopped or has run out of time.
     """
-    max_score = -1000000
+    if search is None:
+        search = Search()
+
+    search.root_depth = depth
+    max_score = alpha
     best_move = None
-    
-    for move in generate_legal_moves(board):
+
+    # The best move of the previous iteration is searched first
+    key = int(board.hash)
+    entry = search.tt.probe(key)
+    tt_move = entry[3] if entry is not None else None
+
+    # Compared in UCI notation, as the equality of the moves ignores the promotion piece
+    excluded = {move.to_uci() for move in excluded}
+    moves = [move for move in generate_legal_moves(board) if move.to_uci() not in excluded]
+    for index, move in enumerate(order_moves(board, moves, tt_move)):
         new_board = board.apply_move(move)
-        score = -minimax(new_board, depth - 1, -1000000, 1000000)  # Initial alpha and beta values
-        if score > max_score:
+        score = pvs(new_board, depth - 1, max(max_score, alpha), beta, search, 1, index == 0)
+        if score > max_score or best_move is None:
             max_score = score
             best_move = move
-    
-    return best_move
+            search.pv_table[0] = [move] + search.pv_table[1]
+        if max_score >= beta:
+            break
+
+    if max_score <= alpha:
+        bound = Bound.UPPER
+    elif max_score >= beta:
+        bound = Bound.LOWER
+    else:
+        bound = Bound.EXACT
+    # Without some of its moves, the score is not the one of the position
+    if not excluded:
+        search.tt.store(key, depth, max_score, bound, best_move)
+    search.principal_variation = search.pv_table[0]
+
+    return max_score, best_move
+
+
+def best_move(board, depth, search=None, stats=None, pv=None):
+    """
+    Find the best move using the minimax algorithm with alpha-beta pruning.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        depth (int): The depth of the search.
+        search (Search): The state of the search, a new one if not given.
+        stats (SearchStats): Statistics filled by the search (they replace the ones of the search state).
+        pv (list): List filled with the principal variation (the best move and the best answers).
+
+    Returns:
+        Move: The best move to make based on the minimax search.
+    """
+    if search is None:
+        search = Search()
+    if stats is not None:
+        search.stats = stats
+    move = search_root(board, depth, search)[1]
+    if pv is not None:
+        pv[:] = search.principal_variation
+    return move
+
+
+def aspiration_search(board, depth, previous_score, search, excluded=()):
+    """
+    Search the root in a narrow window around the score expected from a previous iteration, which cuts more moves.
+    When the score falls outside, the window is widened on that side and the root is searched again.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        depth (int): The depth of the search.
+        previous_score (float): The expected score, None to search with the full window.
+        search (Search): The state of the search.
+        excluded (tuple): Root moves not searched.
+
+    Returns:
+        tuple: The score of the best move and the best move.
+    """
+    if previous_score is None:
+        return search_root(board, depth, search, excluded=excluded)
+
+    delta = ASPIRATION_WINDOW
+    alpha, beta = previous_score - delta, previous_score + delta
+    while True:
+        score, move = search_root(board, depth, search, alpha, beta, excluded)
+        if score <= alpha and alpha > -INFINITY:
+            failure, alpha = "low", max(score - delta, -INFINITY)
+        elif score >= beta and beta < INFINITY:
+            failure, beta = "high", min(score + delta, INFINITY)
+        else:
+            return score, move
+
+        logger.debug("depth %d: score %s failed %s, searching again in (%s, %s)", depth, score, failure, alpha, beta)
+        if search.stats is not None:
+            search.stats.count(f"aspiration_fail_{failure}s", 0)
+        delta *= 2
+        if delta > ASPIRATION_WINDOW * 64:
+            alpha, beta = -INFINITY, INFINITY
+
+
+def mate_search(board, n, search=None):
+    """
+    Find a forced checkmate in at most n moves, without evaluation or pruning: every answer of the defender is
+    searched, so a mate found is certain. The shortest mate is returned.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        n (int): The maximum number of moves of the player to move.
+        search (Search): The state of the search (node counter, stop flag), a new one if not given.
+
+    Returns:
+        Move: The first move of the mate, None if there is no mate in n moves.
+
+    Raises:
+        SearchStopped: If the search has been stopped.
+    """
+    if search is None:
+        search = Search()
+    search.start()
+
+    for moves in range(1, n + 1):
+        move = find_mate(board, moves, search)
+        if move is not None:
+            return move
+    return None
+
+
+def find_mate(board, moves, search):
+    """
+    Find a move of the player to move which mates in at most the given number of moves.
+    The checks are tried first, and only the checks are tried for the last move.
+    """
+    children = []
+    for move in generate_legal_moves(board):
+        new_board = board.apply_move(move)
+        check = new_board.is_in_check()
+        if check or moves > 1:
+            children.append((not check, move, new_board))
+    children.sort(key=lambda child: child[0])
+
+    for _, move, new_board in children:
+        if is_mated(new_board, moves - 1, search):
+            return move
+    return None
+
+
+def is_mated(board, moves, search):
+    """
+    Check if the player to move is mated now or after every answer, with the opponent having the given number of moves.
+    """
+    search.nodes += 1
+    if search.should_stop():
+        raise SearchStopped()
+
+    if board.halfmove_clock >= 100 or board.is_repetition():
+        return False
+
+    answers = list(generate_legal_moves(board))
+    if not answers:
+        return board.is_in_check()
+    if moves == 0:
+        return False
+
+    return all(find_mate(board.apply_move(answer), moves, search) is not None for answer in answers)
+
+
+def iterative_deepening(board, max_depth=None, time_limit=None, search=None, info=None):
+    """
+    Search the position with increasing depths until the maximum depth, the time limit or a stop request.
+    Each iteration searches the best move of the previous one first (through the transposition table),
+    in an aspiration window around the score of the iteration two plies shallower.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        max_depth (int): The last depth to search, None to search until stopped.
+        time_limit (float): Time in seconds given to the search, None for no limit.
+        search (Search): The state of the search, a new one if not given.
+        info (callable): Called after each completed iteration with (depth, score, best move, search).
+
+    Returns:
+        tuple: The best move of the last completed iteration, its score and the depth of this iteration.
+               The principal variation of this iteration is kept in search.principal_variation.
+    """
+    if search is None:
+        search = Search()
+    search.start(time_limit)
+
+    if max_depth is None:
+        max_depth = MAX_DEPTH
+
+    search.principal_variation = []
+    moves = list(generate_legal_moves(board))
+    if not moves:
+        return None, None, 0
+
+    # Fallback if the first iteration is stopped before its end
+    best, best_score, completed_depth = moves[0], None, 0
+    search.principal_variation = [best]
+
+    scores = []
+    for depth in range(1, max_depth + 1):
+        try:
+            expected = scores[-2] if depth >= ASPIRATION_DEPTH else None
+            score, move = aspiration_search(board, depth, expected, search)
+        except SearchStopped:
+            break
+
+        scores.append(score)
+        best, best_score, completed_depth = move, score, depth
+        if info is not None:
+            info(depth, score, move, search)
+
+    return best, best_score, completed_depth
+
+
+def analyse(board, max_depth=None, time_limit=None, multipv=1, search=None, info=None):
+    """
+    Find the best moves of the position with their scores and lines (multi-PV analysis), with iterative deepening.
+    At each depth, the root is searched once per line, without the first moves of the previous lines. The searches
+    share the transposition table, so each line after the first one is much cheaper than a full search.
+
+    Parameters:
+        board (Board): The current state of the game board.
+        max_depth (int): The last depth to search, None to search until stopped.
+        time_limit (float): Time in seconds given to the search, None for no limit.
+        multipv (int): The number of lines (best moves) to find.
+        search (Search): The state of the search, a new one if not given.
+        info (callable): Called after each completed depth with (depth, lines, search).
+
+    Returns:
+        tuple: The lines of the last completed depth, sorted from the best, as (move, score, principal variation)
+               tuples, and this depth. If the first depth is not completed, the lines found so far are returned.
+    """
+    if search is None:
+        search = Search()
+    search.start(time_limit)
+
+    if max_depth is None:
+        max_depth = MAX_DEPTH
+
+    lines, completed_depth = [], 0
+    scores = []  # Scores of the lines at each completed depth
+    for depth in range(1, max_depth + 1):
+        depth_lines = []
+        try:
+            for index in range(multipv):
+                excluded = tuple(line[0] for line in depth_lines)
+                expected = scores[-2][index] if depth >= ASPIRATION_DEPTH and index < len(scores[-2]) else None
+                score, move = aspiration_search(board, depth, expected, search, excluded)
+                if move is None:
+                    break
+                depth_lines.append((move, score, list(search.principal_variation)))
+        except SearchStopped:
+            if completed_depth == 0:
+                lines = sorted(depth_lines, key=lambda line: line[1], reverse=True)
+            break
+
+        lines = sorted(depth_lines, key=lambda line: line[1], reverse=True)
+        completed_depth = depth
+        scores.append([line[1] for line in depth_lines])
+        if info is not None:
+            info(depth, lines, search)
+        if not lines:
+            break
+
+    search.principal_variation = lines[0][2] if lines else []
+    return lines, completed_depth
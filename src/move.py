@@ -50,6 +50,16 @@ class Move:
 
         return Move(src=square_src, dest=square_dest)
     
+    def to_uci(self) -> str:
+        """
+        Convert the move to the notation of the UCI protocol.
+
+        Returns:
+            str: The move in UCI notation, e.g. 'e2e4' or 'e7e8q' for a promotion.
+        """
+        promo = self.promo.to_char() if self.promo is not None else ""
+        return "%s%s%s" % (str(self.src), str(self.dest), promo)
+
     def is_double_push(self):
         return abs(self.src.rank - self.dest.rank) == 2
     
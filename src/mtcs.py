@@ -2,6 +2,7 @@ import math
 from board import *
 from copy import deepcopy
 import random
+import threading
 import time
 from evaluation import *
 
@@ -45,7 +46,7 @@ class MTCS:
         self.run_time = 0
         self.node_count = 0
         self.num_rollouts = 0
-        pass
+        self.stop_event = threading.Event()  # Set from another thread to stop the search before its time limit
         
     def is_fully_expanded(self):
         """
@@ -139,7 +140,7 @@ class MTCS:
 
         num_rollouts = 0
 
-        while time.process_time() - start_time < time_limit:
+        while time.process_time() - start_time < time_limit and not self.stop_event.is_set():
             node, state = self.select()
             outcome = self.rollout(state=state)
             self.backpropagate(node, state.color_turn, outcome)
@@ -166,14 +167,22 @@ class MTCS:
         return best_child.move
     
     def move(self, move: Move):
-        if move in self.root.children:
+        if str(move) in self.root.children:
             self.root_state = self.root_state.apply_move(move)
             self.root = self.root.children[str(move)]
+            self.root.parent = None
             return
         
         self.root_state = self.root_state.apply_move(move)
         self.root = MCTSNode(None, None)
 
+    def stop(self):
+        """
+        Ask the running search (e.g. pondering in another thread) to stop after the current rollout.
+        The searches stop at once until stop_event is cleared.
+        """
+        self.stop_event.set()
+
     def statistics(self) -> tuple:
         """
         Get statistics of the MTCS
@@ -181,4 +190,331 @@ class MTCS:
         Return:
             Tuple : the number of rollout and the run_time
         """
-        return self.num_rollouts, self.run_time
\ No newline at end of file
+        return self.num_rollouts, self.run_time
+
+
+
+def terminal_value(state: Board) -> int:
+    """Get the result of a finished game from the point of view of the side to move
+
+    Parameters:
+        state(Board) : A board where the game is over
+
+    Return:
+        int : -1 if the side to move is checkmated, 0 for a draw
+    """
+    return -1 if is_checkmate(state) else 0
+
+
+class MCTSEdge:
+    def __init__(self, move: Move):
+        self.move = move  # The move played along this edge
+        self.key = None  # Hash of the position reached by the move (known once the move has been played)
+        self.N = 0  # Number of times this move was played from its parent
+        self.Q = 0  # Total reward of this move, seen by the player making it
+
+
+class MCTSGraphNode:
+    def __init__(self):
+        self.edges = None  # Moves from this position (keyed by str(move)), None until expanded
+        self.N = 0  # Number total of visits of this position, whatever the move order leading to it
+        self.Q = 0  # Total reward, seen by the player to move in this position
+
+    def add_edges(self, moves) -> None:
+        """Add the moves of the position as edges
+
+        Parameters:
+            moves : the legal moves of the position
+        """
+        self.edges = {str(move): MCTSEdge(move) for move in moves}
+
+    def value(self) -> float:
+        """Mean reward of the position for the player to move"""
+        return self.Q / self.N if self.N > 0 else 0
+
+    def uct(self, edge: MCTSEdge, child, exploration_factor: float = EXPLORATION_FACTOR) -> float:
+        """Compute the upper confidence bound applied on one move of this position
+
+        The exploitation term comes from the child position (shared between transpositions),
+        the exploration term from the visits of the move itself.
+
+        Parameters:
+            edge(MCTSEdge) : the move to score
+            child(MCTSGraphNode) : the position reached by the move
+            exploration_factor(float) : factor to balance between exploration and exploitation
+        """
+        if edge.N == 0:
+            return math.inf
+        return -child.value() + exploration_factor * math.sqrt(math.log(self.N) / edge.N)
+
+
+class TranspositionMTCS(MTCS):
+    """
+    Monte carlo tree search on a graph of positions (DAG).
+
+    The nodes are stored in a table keyed by the Zobrist hash of the position, so positions reached
+    by different move orders share their statistics. Each move keeps its own statistics (MCTSEdge),
+    which are used for the exploration term of the UCT.
+    """
+    def __init__(self, state: Board, max_rollout_plies: int = None) -> None:
+        super().__init__(state)
+        self.max_rollout_plies = max_rollout_plies
+        self.table = {}
+        self.root = self.node(self.root_state)
+
+    def node(self, state: Board) -> MCTSGraphNode:
+        """Get the node of a position from the table, creating it if the position is unknown
+
+        Parameters:
+            state(Board) : the position
+        """
+        key = int(state.hash)
+        node = self.table.get(key)
+        if node is None:
+            node = MCTSGraphNode()
+            self.table[key] = node
+            self.node_count += 1
+        return node
+
+    def play_edge(self, state: Board, edge: MCTSEdge):
+        """Apply the move of an edge and get the reached position and its node
+
+        Parameters:
+            state(Board) : the position the move is played from
+            edge(MCTSEdge) : the move to play
+        """
+        state = state.apply_move(edge.move)
+        edge.key = int(state.hash)
+        return state, self.node(state)
+
+    def select(self):
+        """
+        Walk down the graph choosing the move with the highest UCT, until reaching a position never expanded,
+        a move never played or a position already on the path (a cycle, scored as a draw)
+
+        Return:
+            Tuple : the path as a list of (node, edge), the reached node, the reached state
+                    and True if the walk stopped on a cycle
+        """
+        node = self.root
+        state = self.root_state
+        path = []
+        on_path = {int(state.hash)}
+
+        while node.edges:
+            edges = list(node.edges.values())
+            scores = [node.uct(edge, self.table.get(edge.key)) for edge in edges]
+            max_value = max(scores)
+            edge = random.choice([e for e, score in zip(edges, scores) if score == max_value])
+
+            path.append((node, edge))
+            state, node = self.play_edge(state, edge)
+
+            if edge.key in on_path:
+                return path, node, state, True
+            on_path.add(edge.key)
+
+            if edge.N == 0:
+                return path, node, state, False
+
+        if node.edges is None and self.expand(node, state):
+            edge = random.choice(list(node.edges.values()))
+            path.append((node, edge))
+            state, node = self.play_edge(state, edge)
+
+        return path, node, state, False
+
+    def expand(self, node: MCTSGraphNode, state: Board) -> bool:
+        """
+        Create the edges of a position for all its legal moves
+
+        Parameters:
+            node(MCTSGraphNode) : Node of the position
+            state(Board) : State of the position
+        """
+        if is_game_over(state):
+            node.edges = {}
+            return False
+
+        node.add_edges(generate_legal_moves(state))
+
+        return True
+
+    def rollout(self, state: Board) -> int:
+        """Simulate a game with random moves from the current state until a terminal state is reached
+        (or until max_rollout_plies moves have been played, which is scored as a draw)
+
+        Parameters:
+            state: the current state of the board.
+
+        Return:
+            the result of the simulation for the side to move in the given state (+1 for win, -1 for loss, 0 for draw)
+        """
+        color = state.color_turn
+        plies = 0
+
+        while not is_game_over(state):
+            if self.max_rollout_plies is not None and plies >= self.max_rollout_plies:
+                return 0
+            state = state.apply_move(random.choice(list(generate_legal_moves(state))))
+            plies += 1
+
+        value = terminal_value(state)
+        return value if state.color_turn == color else -value
+
+    def backpropagate(self, path: list, node: MCTSGraphNode, outcome: int):
+        """
+        Update the visits and rewards of the reached position, then of every move and position of the path
+
+        Parameters:
+            path(list) : The (node, edge) pairs walked from the root
+            node(MCTSGraphNode) : The reached position
+            outcome(int) : the result of the simulation for the side to move in the reached position
+        """
+        node.N += 1
+        node.Q += outcome
+
+        for parent, edge in reversed(path):
+            # The player to move in the parent position is the one who made the move
+            outcome = -outcome
+            edge.N += 1
+            edge.Q += outcome
+            parent.N += 1
+            parent.Q += outcome
+
+    def mtcs_search(self, time_limit: int):
+        """
+        Launch the monte carlo tree search (selection, expansion, simulation, backpropagation)
+
+        Parameters:
+            time_limit(int) : time limit to search in the graph
+        """
+        start_time = time.process_time()
+
+        num_rollouts = 0
+
+        while time.process_time() - start_time < time_limit and not self.stop_event.is_set():
+            path, node, state, is_cycle = self.select()
+            outcome = 0 if is_cycle else self.rollout(state=state)
+            self.backpropagate(path, node, outcome)
+            num_rollouts += 1
+
+        self.run_time = time.process_time() - start_time
+        self.num_rollouts = num_rollouts
+
+    def choose_best_move(self) -> Move:
+        """
+        Choose the best move at the root (the move played the most)
+
+        Return:
+            Move : the best move choosen
+        """
+        if is_game_over(self.root_state) or not self.root.edges:
+            return None
+
+        max_value = max(edge.N for edge in self.root.edges.values())
+        max_edges = [edge for edge in self.root.edges.values() if edge.N == max_value]
+
+        return random.choice(max_edges).move
+
+    def move(self, move: Move):
+        """
+        Play a move at the root, keeping the statistics of the positions already in the table
+
+        Parameters:
+            move(Move) : The move played
+        """
+        self.root_state = self.root_state.apply_move(move)
+        self.root = self.node(self.root_state)
+
+
+class BatchedMTCS(TranspositionMTCS):
+    """
+    Monte carlo tree search where the rollouts are replaced by a vectorized evaluation.
+
+    Each iteration selects batch_size leaves, using a virtual loss so that the selections of the
+    same batch spread over different lines, and scores all of them with a single call to the evaluator.
+    """
+    def __init__(self, state: Board, batch_size: int = 16, evaluator=evaluate_batch,
+                 value_scale: float = 4, virtual_loss: int = 1) -> None:
+        """
+        Parameters:
+            state(Board) : The root position
+            batch_size(int) : Number of leaves scored by each call to the evaluator
+            evaluator : Function taking the stacked bitboards (K, 2, 6) and the colors to move (K,)
+                        and returning the scores (K,) for the colors to move
+            value_scale(float) : Score (in pawns) mapped to a reward of tanh(1)
+            virtual_loss(int) : Number of lost visits temporarily added to a line selected in the batch
+        """
+        super().__init__(state)
+        self.batch_size = batch_size
+        self.evaluator = evaluator
+        self.value_scale = value_scale
+        self.virtual_loss = virtual_loss
+
+    def apply_virtual_loss(self, path: list, node: MCTSGraphNode, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a virtual loss on every move and position of a selected line
+
+        Parameters:
+            path(list) : The (node, edge) pairs walked from the root
+            node(MCTSGraphNode) : The reached position
+            sign(int) : 1 to add the virtual loss, -1 to remove it
+        """
+        loss = sign * self.virtual_loss
+        children = [parent for parent, _ in path[1:]] + [node]
+        for (parent, edge), child in zip(path, children):
+            parent.N += loss
+            edge.N += loss
+            edge.Q -= loss
+            # A loss for the player making the move is a win for the player to move in the child
+            child.Q += loss
+        node.N += loss
+
+    def evaluate_leaves(self, states: list) -> np.ndarray:
+        """Score positions with a single call to the evaluator
+
+        Parameters:
+            states(list) : The positions to score
+
+        Return:
+            np.ndarray : The rewards in [-1, 1] for the side to move in each position
+        """
+        bitboards = np.stack([state.bitboards() for state in states])
+        colors = np.array([state.color_turn for state in states])
+        return np.tanh(self.evaluator(bitboards, colors) / self.value_scale)
+
+    def mtcs_search(self, time_limit: int):
+        """
+        Launch the monte carlo tree search, evaluating the leaves by batches
+
+        Parameters:
+            time_limit(int) : time limit to search in the graph
+        """
+        start_time = time.process_time()
+
+        num_rollouts = 0
+
+        while time.process_time() - start_time < time_limit and not self.stop_event.is_set():
+            leaves = []
+            for _ in range(self.batch_size):
+                path, node, state, is_cycle = self.select()
+                self.apply_virtual_loss(path, node, 1)
+                leaves.append((path, node, state, is_cycle))
+
+            # Finished games and cycles have an exact value, the other leaves are evaluated together
+            outcomes = [0 if is_cycle else (terminal_value(state) if is_game_over(state) else None)
+                        for _, _, state, is_cycle in leaves]
+            pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+            if pending:
+                values = self.evaluate_leaves([leaves[i][2] for i in pending])
+                for i, value in zip(pending, values):
+                    outcomes[i] = float(value)
+
+            for (path, node, _, _), outcome in zip(leaves, outcomes):
+                self.apply_virtual_loss(path, node, -1)
+                self.backpropagate(path, node, outcome)
+
+            num_rollouts += len(leaves)
+
+        self.run_time = time.process_time() - start_time
+        self.num_rollouts = num_rollouts
@@ -0,0 +1,292 @@
+"""
+pgn.py - Portable Game Notation
+
+This file reads and writes games in PGN. The reader is streaming: the games are parsed one by one while the file is
+read, so files of any size can be imported. The moves are written in standard algebraic notation (SAN), resolved
+and validated with the legal moves of each position:
+
+    for game in read_games(open("games.pgn")):
+        print(game.headers["White"], game.headers["Black"], game.result, len(game.moves))
+
+The writer is used by the tournament runner (--pgn) and by the GUI to save the games played.
+"""
+
+import re
+from board import *
+
+# Tags written first and in this order (the seven tag roster), with their value when unknown
+SEVEN_TAG_ROSTER = [("Event", "?"), ("Site", "?"), ("Date", "????.??.??"), ("Round", "?"), ("White", "?"),
+                    ("Black", "?"), ("Result", "*")]
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+# Maximum length of the lines of the movetext
+LINE_LENGTH = 80
+
+PIECE_LETTERS = {"N": PieceType.KNIGHT, "B": PieceType.BISHOP, "R": PieceType.ROOK, "Q": PieceType.QUEEN,
+                 "K": PieceType.KING}
+
+TAG_REGEX = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$')
+SAN_REGEX = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+# Comments, variations, numeric annotation glyphs and the other tokens (moves, move numbers, results)
+TOKEN_REGEX = re.compile(r"\{[^}]*\}|;[^\n]*|\(|\)|\$\d+|[^\s(){};]+")
+MOVE_NUMBER_REGEX = re.compile(r"^\d+\.*")
+
+
+class Game:
+    def __init__(self, headers: dict = None, moves: list = None, result: str = "*"):
+        """
+        A game: its tags, its moves from the initial position (the FEN tag or the standard position) and its result.
+        """
+        self.headers = dict(headers or {})
+        self.moves = list(moves or [])
+        self.result = result
+
+    def initial_board(self) -> Board:
+        """
+        Get the initial position of the game.
+        """
+        board = Board()
+        if "FEN" in self.headers:
+            board.from_fen(self.headers["FEN"])
+        else:
+            board.board_initialization()
+        return board
+
+    def final_board(self) -> Board:
+        """
+        Get the position after the last move of the game.
+        """
+        board = self.initial_board()
+        for move in self.moves:
+            board = board.apply_move(move)
+        return board
+
+
+def legal_piece_moves(board: Board, piece: PieceType, dest: Square = None):
+    """
+    Generate the legal moves of the pieces of one type (going to a square if given): the moves of generate_legal_moves,
+    without generating the moves of the other pieces nor checking the legality of the moves going elsewhere.
+    """
+    for src in utils.occupied_squares(board.get_piece_bb(piece)):
+        for move in generate_piece_moves(src, board, piece):
+            if (dest is None or move.dest == dest) and not leaves_in_check(board, move):
+                yield move
+
+
+def move_to_san(board: Board, move: Move, legal_moves: list = None) -> str:
+    """
+    Write a legal move in standard algebraic notation, e.g. 'Nbd7', 'exd5', 'e8=Q+' or 'O-O'.
+
+    Parameters:
+        board (Board): The position before the move.
+        move (Move): The move.
+        legal_moves (list): The legal moves of the position, only the ones of the moved piece type are generated
+                            if not given.
+
+    Returns:
+        str: The move in SAN, with its check ('+') or mate ('#') suffix.
+    """
+    if move.is_castling:
+        san = "O-O" if move.dest.position > move.src.position else "O-O-O"
+    else:
+        piece = board.piece_on(move.src)
+        capture = move.en_passant or board.piece_on(move.dest, Board.opposite_color(board.color_turn)) is not None
+        if piece == PieceType.PAWN:
+            san = (str(move.src)[0] + "x" if capture else "") + str(move.dest)
+            if move.promo is not None:
+                san += "=" + move.promo.to_char().upper()
+        else:
+            if legal_moves is None:
+                legal_moves = list(legal_piece_moves(board, piece, move.dest))
+            # The other pieces of the same type going to the same square
+            others = [other.src for other in legal_moves
+                      if other.dest == move.dest and other.src != move.src and board.piece_on(other.src) == piece]
+            if not others:
+                origin = ""
+            elif all(other.file != move.src.file for other in others):
+                origin = str(move.src)[0]
+            elif all(other.rank != move.src.rank for other in others):
+                origin = str(move.src)[1]
+            else:
+                origin = str(move.src)
+            san = piece.to_char().upper() + origin + ("x" if capture else "") + str(move.dest)
+
+    new_board = board.apply_move(move)
+    if new_board.is_in_check():
+        san += "+" if next(generate_legal_moves(new_board), None) is not None else "#"
+    return san
+
+
+def parse_san(board: Board, san: str, legal_moves: list = None) -> Move:
+    """
+    Find the legal move written in standard algebraic notation.
+
+    Parameters:
+        board (Board): The position.
+        san (str): The move in SAN (the check and annotation suffixes are ignored, '0-0' is accepted).
+        legal_moves (list): The legal moves of the position, only the ones of the piece type named are generated
+                            if not given.
+
+    Returns:
+        Move: The legal move.
+
+    Raises:
+        ValueError: If the move is not legal or is ambiguous.
+    """
+    text = san.rstrip("+#!?")
+
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        king_side = len(text) == 3
+        if legal_moves is None:
+            legal_moves = legal_piece_moves(board, PieceType.KING)
+        candidates = [move for move in legal_moves
+                      if move.is_castling and (move.dest.position > move.src.position) == king_side]
+    else:
+        match = SAN_REGEX.match(text)
+        if match is None:
+            raise ValueError(f"Invalid move '{san}'")
+        letter, file, rank, dest, promo = match.groups()
+        piece = PIECE_LETTERS[letter] if letter else PieceType.PAWN
+        dest = Square.from_string(dest)
+        promo = PIECE_LETTERS[promo] if promo else None
+        if legal_moves is None:
+            legal_moves = legal_piece_moves(board, piece, dest)
+
+        candidates = [move for move in legal_moves
+                      if move.dest == dest and move.promo == promo and not move.is_castling
+                      and (file is None or str(move.src)[0] == file) and (rank is None or str(move.src)[1] == rank)]
+        # The type of the piece moved is only looked up for the few moves going to the square
+        candidates = [move for move in candidates if board.piece_on(move.src) == piece]
+
+    if not candidates:
+        raise ValueError(f"Illegal move '{san}' in {board.to_fen()}")
+    if len(candidates) > 1:
+        raise ValueError(f"Ambiguous move '{san}' in {board.to_fen()}")
+    return candidates[0]
+
+
+def parse_movetext(game: Game, movetext: str) -> None:
+    """
+    Read the moves and the result of a game, skipping the comments, the variations and the annotations.
+
+    Raises:
+        ValueError: If a move is not legal.
+    """
+    board = game.initial_board()
+    variation_depth = 0
+    for token in TOKEN_REGEX.findall(movetext):
+        if token == "(":
+            variation_depth += 1
+        elif token == ")":
+            variation_depth -= 1
+        elif variation_depth > 0 or token[0] in "{;$":
+            continue
+        elif token in RESULTS:
+            game.result = token
+        else:
+            # Move numbers may be attached to the move ('12.e4')
+            token = MOVE_NUMBER_REGEX.sub("", token)
+            if token:
+                move = parse_san(board, token)
+                game.moves.append(move)
+                board = board.apply_move(move)
+
+
+def read_games(file):
+    """
+    Read the games of a PGN file lazily.
+
+    Parameters:
+        file: An iterable of lines, e.g. an open file.
+
+    Yields:
+        Game: The games, in the order of the file.
+
+    Raises:
+        ValueError: If a move of a game is not legal (with the number of the game).
+    """
+    headers, movetext = {}, []
+    in_comment = False
+    count = 0
+
+    def make_game():
+        game = Game(headers, result=headers.get("Result", "*"))
+        try:
+            parse_movetext(game, " ".join(movetext))
+        except ValueError as error:
+            raise ValueError(f"Game {count + 1}: {error}")
+        return game
+
+    for line in file:
+        line = line.strip()
+        if not in_comment and line.startswith("["):
+            # A tag after some moves starts the next game
+            if movetext:
+                yield make_game()
+                count += 1
+                headers, movetext = {}, []
+            match = TAG_REGEX.match(line)
+            if match is not None:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"').replace("\\\\", "\\")
+        elif line and not line.startswith("%"):
+            movetext.append(line)
+            in_comment = line.count("{") + in_comment > line.count("}")
+
+    if headers or movetext:
+        yield make_game()
+
+
+def game_to_pgn(game: Game) -> str:
+    """
+    Write a game in PGN, with its moves in SAN.
+
+    Returns:
+        str: The PGN of the game, ending with an empty line.
+    """
+    headers = dict(game.headers)
+    headers["Result"] = game.result
+    if "FEN" in headers:
+        headers.setdefault("SetUp", "1")
+    tags = [(tag, headers.pop(tag, default)) for tag, default in SEVEN_TAG_ROSTER] + list(headers.items())
+    lines = ['[%s "%s"]' % (tag, str(value).replace("\\", "\\\\").replace('"', '\\"')) for tag, value in tags]
+    lines.append("")
+
+    board = game.initial_board()
+    tokens = []
+    for index, move in enumerate(game.moves):
+        if board.color_turn == Color.WHITE:
+            tokens.append(f"{board.fullmove_number}.")
+        elif index == 0:
+            tokens.append(f"{board.fullmove_number}...")
+        tokens.append(move_to_san(board, move))
+        board = board.apply_move(move)
+    tokens.append(game.result)
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+
+    return "\n".join(lines) + "\n\n"
+
+
+def write_game(file, game: Game) -> None:
+    """
+    Append a game to an open PGN file.
+    """
+    file.write(game_to_pgn(game))
+
+
+def move_between(board: Board, next_board: Board) -> Move:
+    """
+    Find the legal move leading from a position to the next one (e.g. to record the moves of the GUI).
+
+    Returns:
+        Move: The move, None if the positions do not follow each other.
+    """
+    return next((move for move in generate_legal_moves(board) if board.apply_move(move).hash == next_board.hash), None)
@@ -28,6 +28,8 @@ ANTIDIAG = np.uint64(0x0102040810204080)
 
 CENTER = np.uint64(0x00003C3C3C3C0000)
 
+LIGHT_SQUARES = np.uint64(0x55AA55AA55AA55AA)
+
 def compute_diag_mask(index: np.uint8) -> np.uint64:
     """
     Compute the diagonal mask for the given index 'i'.
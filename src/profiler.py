@@ -0,0 +1,275 @@
+"""
+profiler.py - Hot Path Profiler
+
+This module times the hot functions of the engine (move generation, legality check, apply_move, piece_on, evaluate
+and occupied_squares): when enabled, they are wrapped to count their calls and their cumulative time, and a table
+sorted by time is printed at exit. It is enabled by the KASPICH_PROFILE environment variable (for the entry points
+calling enable_from_environment) or by the --profile flag of bench.py.
+
+A single search can also be profiled in detail with cProfile (pstats file) or as a speedscope file
+(https://www.speedscope.app) holding the full call stacks:
+
+    python src/profiler.py minmax --depth 2 --output search.prof
+    python src/profiler.py mtcs --time 2 --output search.speedscope.json
+"""
+
+import argparse
+import atexit
+import cProfile
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+
+# Environment variable enabling the hot path timers
+PROFILE_ENV = "KASPICH_PROFILE"
+
+# Hot functions as (module, qualified name)
+HOT_FUNCTIONS = [
+    ("board", "generate_piece_moves"),
+    ("board", "leaves_in_check"),
+    ("board", "Board.apply_move"),
+    ("board", "Board.piece_on"),
+    ("evaluation", "evaluate"),
+    ("utils", "occupied_squares"),
+]
+
+
+class Timer:
+    def __init__(self, name: str):
+        """
+        Number of calls and cumulative time (in seconds) of a function.
+        """
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+
+
+# Timers of the wrapped functions and the original functions, by qualified name
+timers = {}
+originals = {}
+
+
+def timed(function, timer: Timer):
+    """
+    Wrap a function to count its calls and its time in a timer.
+    The time of a generator is the time spent producing its values (not the time of the caller between them).
+    """
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            timer.calls += 1
+            generator = function(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    value = next(generator)
+                except StopIteration:
+                    timer.time += time.perf_counter() - start
+                    return
+                timer.time += time.perf_counter() - start
+                yield value
+    else:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timer.calls += 1
+                timer.time += time.perf_counter() - start
+    return wrapper
+
+
+def replace(original, replacement) -> None:
+    """
+    Replace a function everywhere it is bound: the functions imported with 'from module import *'
+    are copied in the namespace of each importing module.
+    """
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if namespace is None:
+            continue
+        for name, value in list(namespace.items()):
+            if value is original:
+                setattr(module, name, replacement)
+
+
+def enable(report_at_exit: bool = True) -> None:
+    """
+    Wrap the hot functions with timers (the engine modules are imported first).
+
+    Parameters:
+        report_at_exit (bool): Print the table of the timers when the program ends.
+    """
+    if originals:
+        return
+
+    for module_name, name in HOT_FUNCTIONS:
+        module = __import__(module_name)
+        owner, _, attribute = name.rpartition(".")
+        owner = getattr(module, owner) if owner else module
+
+        original = getattr(owner, attribute)
+        timers[name] = Timer(name)
+        originals[name] = (owner, attribute, original)
+        wrapper = timed(original, timers[name])
+        if inspect.isclass(owner):
+            setattr(owner, attribute, wrapper)
+        else:
+            replace(original, wrapper)
+
+    if report_at_exit:
+        atexit.register(report)
+
+
+def disable() -> None:
+    """
+    Put the original hot functions back (the timers are kept).
+    """
+    for name, (owner, attribute, original) in originals.items():
+        if inspect.isclass(owner):
+            setattr(owner, attribute, original)
+        else:
+            replace(getattr(owner, attribute), original)
+    originals.clear()
+    atexit.unregister(report)
+
+
+def enable_from_environment() -> bool:
+    """
+    Enable the timers if the KASPICH_PROFILE environment variable is set (and not '0').
+
+    Returns:
+        bool: True if the timers are enabled.
+    """
+    if os.environ.get(PROFILE_ENV, "0") not in ("", "0"):
+        enable()
+        return True
+    return False
+
+
+def reset() -> None:
+    """
+    Set all the timers back to 0.
+    """
+    for timer in timers.values():
+        timer.calls = 0
+        timer.time = 0.0
+
+
+def report(file=None) -> None:
+    """
+    Print the timers sorted by cumulative time. The time of a function includes the hot functions it calls.
+
+    Parameters:
+        file: Where the table is written, the standard error if not given.
+    """
+    file = file or sys.stderr
+    print(f"{'function':<24} {'calls':>10} {'time (s)':>10} {'us/call':>10}", file=file)
+    for timer in sorted(timers.values(), key=lambda timer: timer.time, reverse=True):
+        per_call = timer.time / timer.calls * 1e6 if timer.calls else 0.0
+        print(f"{timer.name:<24} {timer.calls:>10} {timer.time:>10.3f} {per_call:>10.1f}", file=file)
+
+
+def speedscope_profile(function, *args, **kwargs):
+    """
+    Call a function and record every Python call and return of the current thread.
+
+    Returns:
+        tuple: The result of the function and the profile in the speedscope file format.
+    """
+    frames = []
+    frame_indexes = {}
+    events = []
+    start = time.perf_counter()
+
+    def hook(frame, event, arg):
+        if event not in ("call", "return"):
+            return
+        code = frame.f_code
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = frame_indexes.get(key)
+        if index is None:
+            index = frame_indexes[key] = len(frames)
+            frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        events.append({"type": "O" if event == "call" else "C", "frame": index, "at": time.perf_counter() - start})
+
+    sys.setprofile(hook)
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    end = time.perf_counter() - start
+
+    profile = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "evented",
+            "name": getattr(function, "__name__", "profile"),
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": end,
+            "events": events,
+        }],
+        "exporter": "kaspich profiler",
+    }
+    return result, profile
+
+
+def profile_call(output: str, function, *args, **kwargs):
+    """
+    Profile a single call (e.g. best_move or mtcs_search) and write the profile to a file:
+    a speedscope file if its name ends with '.speedscope.json', a cProfile (pstats) file otherwise.
+
+    Parameters:
+        output (str): The path of the profile.
+        function (callable): The function to profile, called with the other arguments.
+
+    Returns:
+        The result of the function.
+    """
+    if output.endswith(".speedscope.json"):
+        result, profile = speedscope_profile(function, *args, **kwargs)
+        with open(output, "w") as file:
+            json.dump(profile, file)
+        return result
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(output)
+
+
+def main():
+    from minmax import best_move, Board
+    from mtcs import MTCS
+
+    parser = argparse.ArgumentParser(description="Profile a single search of a position.")
+    parser.add_argument("search", choices=["minmax", "mtcs"], help="the search to profile")
+    parser.add_argument("--fen", default="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", help="the position")
+    parser.add_argument("--depth", type=int, default=2, help="depth of the minmax search")
+    parser.add_argument("--time", type=float, default=2, help="time of the mtcs search in seconds")
+    parser.add_argument("--output", default="search.prof",
+                        help="pstats file, or speedscope file if the name ends with .speedscope.json")
+    args = parser.parse_args()
+
+    board = Board()
+    board.from_fen(args.fen)
+
+    enable()
+    if args.search == "minmax":
+        move = profile_call(args.output, best_move, board, args.depth)
+    else:
+        mcts = MTCS(board)
+        profile_call(args.output, mcts.mtcs_search, args.time)
+        move = mcts.choose_best_move()
+    print(f"Best move {move}, profile written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+search_stats.py - Search Statistics
+
+This module defines the statistics collected by the minimax search when they are asked for: the nodes, quiescence
+nodes, beta cutoffs (and how many of them came from the first move searched), transposition table probes, hits and
+cutoffs, evaluation calls, re-searches of the principal variation search and of the aspiration windows (at the
+root), null move cutoffs, and late move reductions and their re-searches, for each ply of the search. They are used to tune the move ordering and the pruning.
+The search only counts when a SearchStats object is given, so there is nearly no cost otherwise.
+"""
+
+import json
+
+# Names of the counters kept for each ply
+COUNTERS = ("nodes", "qnodes", "beta_cutoffs", "first_move_cutoffs", "tt_probes", "tt_hits", "tt_cutoffs", "eval_calls",
+            "pvs_researches", "aspiration_fail_lows", "aspiration_fail_highs", "null_move_cutoffs", "lmr_reductions",
+            "lmr_researches")
+
+
+class SearchStats:
+    def __init__(self):
+        """
+        Create empty statistics. They add up over the searches until reset.
+        """
+        self.plies = {}  # ply -> {counter: count}
+
+    def count(self, counter: str, ply: int, amount: int = 1) -> None:
+        """
+        Increment a counter.
+
+        Parameters:
+            counter (str): The name of the counter, one of COUNTERS.
+            ply (int): Distance of the node from the root of the search.
+            amount (int): Value added to the counter.
+        """
+        counters = self.plies.get(ply)
+        if counters is None:
+            counters = self.plies[ply] = dict.fromkeys(COUNTERS, 0)
+        counters[counter] += amount
+
+    def total(self, counter: str) -> int:
+        """
+        Get the value of a counter summed over all the plies.
+        """
+        return sum(counters[counter] for counters in self.plies.values())
+
+    def first_move_cutoff_rate(self) -> float:
+        """
+        Get the fraction of the beta cutoffs produced by the first move searched (1 for a perfect move ordering).
+        """
+        cutoffs = self.total("beta_cutoffs")
+        return self.total("first_move_cutoffs") / cutoffs if cutoffs else 0.0
+
+    def tt_hit_rate(self) -> float:
+        """
+        Get the fraction of the transposition table probes which found the position.
+        """
+        probes = self.total("tt_probes")
+        return self.total("tt_hits") / probes if probes else 0.0
+
+    def reset(self) -> None:
+        """
+        Set all the counters back to 0.
+        """
+        self.plies.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Get the statistics as a dictionary: the totals, the rates and the counters of each ply.
+        """
+        result = {counter: self.total(counter) for counter in COUNTERS}
+        result["first_move_cutoff_rate"] = self.first_move_cutoff_rate()
+        result["tt_hit_rate"] = self.tt_hit_rate()
+        result["plies"] = [dict(ply=ply, **self.plies[ply]) for ply in sorted(self.plies)]
+        return result
+
+    def dump(self, file) -> None:
+        """
+        Write the statistics as JSON.
+
+        Parameters:
+            file: A path or a file-like object.
+        """
+        if isinstance(file, str):
+            with open(file, "w") as output:
+                json.dump(self.to_dict(), output, indent=2)
+        else:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def __str__(self) -> str:
+        return (f"nodes {self.total('nodes')} qnodes {self.total('qnodes')} cutoffs {self.total('beta_cutoffs')} "
+                f"first_move_cutoffs {self.first_move_cutoff_rate():.1%} tt_hits {self.tt_hit_rate():.1%} "
+                f"eval_calls {self.total('eval_calls')} aspiration_researches "
+                f"{self.total('aspiration_fail_lows') + self.total('aspiration_fail_highs')}")
@@ -0,0 +1,519 @@
+"""
+server.py - JSON-RPC Analysis Server
+
+This file runs a long-lived analysis server, so the clients do not pay the start of Python and the building of the
+move tables for each request. It keeps a pool of warm engine processes (tables built, transposition table allocated)
+and answers JSON-RPC 2.0 requests, one JSON object per line, on a Unix socket or a localhost TCP port:
+
+    python src/server.py --unix /tmp/kaspich.sock --workers 4
+    python src/server.py --port 8765
+
+Methods (the positions are given as FEN, the searches take a 'depth' and/or a 'time' limit in seconds):
+    analyse      {"fen", "depth", "time", "multipv"}  -> {"lines": [{"move", "score", "mate", "pv"}], "depth", "nodes", "time"}
+    bestmove     {"fen", "depth", "time"}             -> {"move", "ponder", "score", "mate", "depth", "nodes", "time"}
+    perft        {"fen", "depth", "time"}             -> {"nodes", "time"}
+    legal_moves  {"fen"}                              -> {"moves"}
+    cancel       {"id"}                               -> {"cancelled"}
+
+The requests of a client are handled concurrently. When all the engines are busy, the requests wait for one of them,
+up to a maximum number of waiting requests after which they are refused (server busy); a client with too many
+requests in flight is not read anymore until some of them are answered. A request is cancelled by the 'cancel'
+method or when its client disconnects: the engine searching it is stopped at once.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from minmax import *
+
+# Depth of the searches without depth nor time limit
+DEFAULT_DEPTH = 3
+
+# Size of the transposition table of each engine process
+ENGINE_TT_SIZE = 1 << 18
+
+# Requests of one client handled at the same time, the client is not read while they are all in flight
+MAX_CLIENT_REQUESTS = 16
+
+# Methods answered by the engines
+METHODS = ("analyse", "bestmove", "perft", "legal_moves")
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_BUSY = -32000
+TIME_LIMIT_REACHED = -32001
+REQUEST_CANCELLED = -32800
+
+
+class RPCError(Exception):
+    """Error sent back to the client as a JSON-RPC error."""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class EngineSearch(Search):
+    """
+    Search of an engine process, also stopped when the server cancels its request.
+    The cancel flag is shared with the server process and only cleared by it, so a cancellation is never lost.
+    """
+    def __init__(self, cancel_event, tt_size: int = ENGINE_TT_SIZE):
+        super().__init__(tt_size)
+        self.cancel_event = cancel_event
+
+    def should_stop(self) -> bool:
+        return super().should_stop() or self.cancel_event.is_set()
+
+
+def read_board(params: dict) -> Board:
+    """
+    Get the board of the 'fen' parameter.
+
+    Raises:
+        RPCError: If the FEN is missing or invalid.
+    """
+    if not isinstance(params.get("fen"), str):
+        raise RPCError(INVALID_PARAMS, "Missing parameter 'fen'")
+    board = Board()
+    try:
+        board.from_fen(params["fen"])
+    except (ValueError, IndexError, KeyError, AttributeError) as error:
+        raise RPCError(INVALID_PARAMS, f"Invalid FEN: {error}")
+    return board
+
+
+def read_limits(params: dict) -> tuple:
+    """
+    Get the depth and the time limit of a search, DEFAULT_DEPTH if none of them is given.
+
+    Raises:
+        RPCError: If a limit is not a positive number.
+    """
+    depth, time_limit = params.get("depth"), params.get("time")
+    if depth is not None and (not isinstance(depth, int) or depth < 1):
+        raise RPCError(INVALID_PARAMS, "'depth' must be a positive integer")
+    if time_limit is not None and (not isinstance(time_limit, (int, float)) or time_limit <= 0):
+        raise RPCError(INVALID_PARAMS, "'time' must be a positive number of seconds")
+    if depth is None and time_limit is None:
+        depth = DEFAULT_DEPTH
+    return depth, time_limit
+
+
+def score_fields(score) -> dict:
+    """
+    Score in pawns and moves before the mate (None if there is no mate), as JSON values.
+    """
+    if score is None:
+        return {"score": None, "mate": None}
+    return {"score": float(score), "mate": mate_in(score)}
+
+
+def perft(board: Board, depth: int, search: Search) -> int:
+    """
+    Count the positions at the given depth, stopping when the search is stopped.
+
+    Raises:
+        SearchStopped: If the search has been stopped or has run out of time.
+    """
+    if search.should_stop():
+        raise SearchStopped()
+    if depth == 0:
+        return 1
+    moves = generate_legal_moves(board)
+    if depth == 1:
+        return sum(1 for _ in moves)
+    return sum(perft(board.apply_move(move), depth - 1, search) for move in moves)
+
+
+def run_method(method: str, params: dict, search: EngineSearch) -> dict:
+    """
+    Answer a request (in an engine process).
+
+    Raises:
+        RPCError: If the method is unknown or its parameters are invalid.
+        SearchStopped: If a perft has been cancelled or has run out of time.
+    """
+    start_time = time.perf_counter()
+    board = read_board(params)
+
+    if method == "legal_moves":
+        return {"moves": [move.to_uci() for move in generate_legal_moves(board)]}
+
+    depth, time_limit = read_limits(params)
+    if method == "perft":
+        if params.get("depth") is None:
+            raise RPCError(INVALID_PARAMS, "Missing parameter 'depth'")
+        search.start(time_limit)
+        return {"nodes": perft(board, depth, search), "time": time.perf_counter() - start_time}
+
+    if method == "bestmove":
+        move, score, completed_depth = iterative_deepening(board, depth, time_limit, search)
+        pv = search.principal_variation
+        return dict(move=move.to_uci() if move is not None else None,
+                    ponder=pv[1].to_uci() if len(pv) > 1 and pv[0] == move else None,
+                    depth=completed_depth, nodes=search.nodes, time=time.perf_counter() - start_time,
+                    **score_fields(score))
+
+    if method == "analyse":
+        multipv = params.get("multipv", 1)
+        if not isinstance(multipv, int) or multipv < 1:
+            raise RPCError(INVALID_PARAMS, "'multipv' must be a positive integer")
+        lines, completed_depth = analyse(board, depth, time_limit, multipv, search)
+        return {
+            "lines": [dict(move=move.to_uci(), pv=[pv_move.to_uci() for pv_move in pv], **score_fields(score))
+                      for move, score, pv in lines],
+            "depth": completed_depth,
+            "nodes": search.nodes,
+            "time": time.perf_counter() - start_time,
+        }
+
+    raise RPCError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+
+
+def engine_main(connection, cancel_event, tt_size: int) -> None:
+    """
+    Loop of an engine process: build the tables and the transposition table once, then answer the requests
+    received on the connection until None is received.
+    """
+    search = EngineSearch(cancel_event, tt_size)
+    # Warm up the move generation before telling the server the engine is ready
+    board = Board()
+    board.board_initialization()
+    list(generate_legal_moves(board))
+    connection.send(("ready", None))
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+        method, params = message
+        try:
+            connection.send(("result", run_method(method, params, search)))
+        except RPCError as error:
+            connection.send(("error", (error.code, error.message)))
+        except SearchStopped:
+            if cancel_event.is_set():
+                connection.send(("error", (REQUEST_CANCELLED, "Request cancelled")))
+            else:
+                connection.send(("error", (TIME_LIMIT_REACHED, "Time limit reached")))
+        except Exception as error:
+            connection.send(("error", (INTERNAL_ERROR, f"Internal error: {error!r}")))
+
+
+class Engine:
+    def __init__(self, tt_size: int = ENGINE_TT_SIZE):
+        """
+        Start an engine process.
+        """
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.cancel_event = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=engine_main, args=(child_connection, self.cancel_event, tt_size),
+                                               daemon=True)
+        self.process.start()
+
+    def wait_ready(self) -> None:
+        """
+        Wait until the engine has built its tables.
+        """
+        self.connection.recv()
+
+    def request(self, method: str, params: dict):
+        """
+        Send a request to the engine and wait for its answer (in a thread of the server).
+        The cancel flag is cleared by the server before, so a cancellation cannot be lost before the request is sent.
+
+        Returns:
+            tuple: ('result', result) or ('error', (code, message)).
+        """
+        self.connection.send((method, params))
+        return self.connection.recv()
+
+    def close(self) -> None:
+        """
+        Stop the engine process.
+        """
+        self.connection.send(None)
+        self.process.join()
+
+
+class AnalysisServer:
+    def __init__(self, workers: int = None, tt_size: int = ENGINE_TT_SIZE, max_waiting: int = None):
+        """
+        Create the server (the engines are started by start).
+
+        Parameters:
+            workers (int): Number of engine processes, the number of CPUs if not given.
+            tt_size (int): Size of the transposition table of each engine.
+            max_waiting (int): Requests waiting for an engine above which the requests are refused,
+                               8 per engine if not given.
+        """
+        self.workers = workers or os.cpu_count()
+        self.tt_size = tt_size
+        self.max_waiting = 8 * self.workers if max_waiting is None else max_waiting
+        self.engines = []
+        self.idle = None
+        self.waiting = 0
+        self.threads = ThreadPoolExecutor(max_workers=self.workers)
+
+    async def start(self) -> None:
+        """
+        Start the engines and wait until they are all ready.
+        """
+        loop = asyncio.get_running_loop()
+        self.engines = [Engine(self.tt_size) for _ in range(self.workers)]
+        await asyncio.gather(*(loop.run_in_executor(self.threads, engine.wait_ready) for engine in self.engines))
+        self.idle = asyncio.Queue()
+        for engine in self.engines:
+            self.idle.put_nowait(engine)
+
+    async def close(self) -> None:
+        """
+        Stop the engines (after their current request).
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.threads, engine.close) for engine in self.engines))
+        self.engines = []
+        self.threads.shutdown()
+
+    async def call(self, method: str, params: dict) -> dict:
+        """
+        Answer a request with the first idle engine. When the task is cancelled, the engine is stopped.
+
+        Returns:
+            dict: The result of the request.
+
+        Raises:
+            RPCError: If the request is refused or fails.
+        """
+        if method not in METHODS:
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method '{method}'")
+        if self.idle.empty() and self.waiting >= self.max_waiting:
+            raise RPCError(SERVER_BUSY, "Server busy")
+
+        self.waiting += 1
+        try:
+            engine = await self.idle.get()
+        finally:
+            self.waiting -= 1
+
+        loop = asyncio.get_running_loop()
+        engine.cancel_event.clear()
+        answer = loop.run_in_executor(self.threads, engine.request, method, params)
+        # The engine is given back once it has answered, even if the request has been cancelled
+        answer.add_done_callback(lambda _: self.idle.put_nowait(engine))
+        try:
+            kind, value = await asyncio.shield(answer)
+        except asyncio.CancelledError:
+            if not answer.done():
+                engine.cancel_event.set()
+            raise
+
+        if kind == "error":
+            raise RPCError(*value)
+        return value
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Read the requests of a client and answer them concurrently, until the client disconnects.
+        """
+        tasks = {}  # request id -> task
+        slots = asyncio.Semaphore(MAX_CLIENT_REQUESTS)
+        write_lock = asyncio.Lock()
+
+        async def send(message):
+            async with write_lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+
+        async def answer(request_id, method, params):
+            try:
+                response = {"jsonrpc": "2.0", "id": request_id, "result": await self.call(method, params)}
+            except RPCError as error:
+                response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": error.code, "message": error.message}}
+            except asyncio.CancelledError:
+                response = {"jsonrpc": "2.0", "id": request_id,
+                            "error": {"code": REQUEST_CANCELLED, "message": "Request cancelled"}}
+            finally:
+                tasks.pop(request_id, None)
+                slots.release()
+            if request_id is not None:
+                try:
+                    await send(response)
+                except ConnectionError:
+                    pass
+
+        try:
+            while True:
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    slots.release()
+                    break
+
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    slots.release()
+                    await send({"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": "Parse error"}})
+                    continue
+
+                request_id = request.get("id") if isinstance(request, dict) else None
+                method = request.get("method") if isinstance(request, dict) else None
+                params = request.get("params", {}) if isinstance(request, dict) else None
+                if not isinstance(method, str) or not isinstance(params, dict):
+                    slots.release()
+                    await send({"jsonrpc": "2.0", "id": request_id,
+                                "error": {"code": INVALID_REQUEST, "message": "Invalid request"}})
+                    continue
+
+                if method == "cancel":
+                    slots.release()
+                    task = tasks.get(params.get("id"))
+                    if task is not None:
+                        task.cancel()
+                    if request_id is not None:
+                        await send({"jsonrpc": "2.0", "id": request_id, "result": {"cancelled": task is not None}})
+                    continue
+
+                task = asyncio.create_task(answer(request_id, method, params))
+                if request_id is not None:
+                    tasks[request_id] = task
+        except ConnectionError:
+            pass
+        finally:
+            # The client is gone: its requests are cancelled
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """
+        Listen on a TCP port (0 for a free port, see the sockets of the returned server).
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Listen on a Unix socket.
+        """
+        return await asyncio.start_unix_server(self.handle_connection, path)
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        JSON-RPC client of the analysis server (see connect_tcp and connect_unix).
+        """
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.responses = {}  # request id -> future of the response
+        self.reading = asyncio.create_task(self.read_responses())
+
+    @classmethod
+    async def connect_tcp(cls, host: str, port: int) -> "Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "Client":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def read_responses(self) -> None:
+        """
+        Give the responses to the requests waiting for them.
+        """
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.responses.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.responses.values():
+            future.set_exception(ConnectionError("Connection closed by the server"))
+
+    def send(self, method: str, **params) -> tuple:
+        """
+        Send a request without waiting for its response.
+
+        Returns:
+            tuple: The id of the request and the future of its response.
+        """
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.responses[self.next_id] = future
+        self.writer.write((json.dumps({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params})
+                           + "\n").encode())
+        return self.next_id, future
+
+    async def call(self, method: str, **params) -> dict:
+        """
+        Send a request and wait for its result.
+
+        Raises:
+            RPCError: If the server answers with an error.
+        """
+        _, future = self.send(method, **params)
+        await self.writer.drain()
+        response = await future
+        if "error" in response:
+            raise RPCError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    async def cancel(self, request_id: int) -> bool:
+        """
+        Cancel a request sent with send (its response is a 'Request cancelled' error).
+
+        Returns:
+            bool: False if the request was already answered.
+        """
+        return (await self.call("cancel", id=request_id))["cancelled"]
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.reading.cancel()
+
+
+async def serve(args) -> None:
+    server = AnalysisServer(args.workers, max_waiting=args.max_waiting)
+    await server.start()
+    if args.unix is not None:
+        listener = await server.serve_unix(args.unix)
+    else:
+        listener = await server.serve_tcp("127.0.0.1", args.port)
+    print(f"Listening on {', '.join(str(socket.getsockname()) for socket in listener.sockets)}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve analysis requests (JSON-RPC) with a pool of warm engines.")
+    parser.add_argument("--unix", default=None, help="path of the Unix socket to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="localhost TCP port to listen on (without --unix)")
+    parser.add_argument("--workers", type=int, default=None, help="number of engine processes (default: number of CPUs)")
+    parser.add_argument("--max-waiting", type=int, default=None,
+                        help="requests waiting for an engine above which the requests are refused")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+tournament.py - Self-play Tournament Runner
+
+This file plays matches between two bots without the GUI. The games are played concurrently in a process pool,
+from a set of opening positions (each opening is played twice, once with each color for each bot).
+The results are written as they arrive (one JSON object per line) and the match is summarized by the Elo
+difference with its error bars and, optionally, a sequential probability ratio test (SPRT) which stops the match
+as soon as one of the hypotheses is accepted.
+
+    python src/tournament.py minmax:2 random --games 100 --workers 4 --output results.jsonl --pgn games.pgn --sprt 0 50
+
+A bot is given as 'name' or 'name:parameter': 'random', 'minmax:<depth>' or 'mtcs:<seconds>'.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from chess_bot import *
+from pgn import Game, write_game
+
+# Bots choosing a move from a board and the parameter of their spec (None if not given)
+ENGINES = {
+    "random": lambda board, param: random_move(board),
+    "minmax": lambda board, param: minmax_move(board, int(param) if param else 3),
+    "mtcs": lambda board, param: mtcs_move(board, float(param) if param else 15, verbose=False),
+}
+
+# Openings used when no file is given
+DEFAULT_OPENINGS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/2p5/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+]
+
+
+def parse_engine(spec: str):
+    """
+    Get the move function of a bot from its spec.
+
+    Parameters:
+        spec (str): 'name' or 'name:parameter', e.g. 'minmax:2'.
+
+    Returns:
+        callable: Function choosing a move for a board.
+
+    Raises:
+        ValueError: If the bot is unknown.
+    """
+    name, _, param = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of {', '.join(ENGINES)}")
+    engine = ENGINES[name]
+    return lambda board: engine(board, param or None)
+
+
+def play_game(white: str, black: str, fen: str, max_plies: int = 200, seed: int = None) -> dict:
+    """
+    Play one game between two bots.
+
+    Parameters:
+        white (str): Spec of the bot playing white.
+        black (str): Spec of the bot playing black.
+        fen (str): The starting position.
+        max_plies (int): Number of half moves after which the game is adjudicated as a draw.
+        seed (int): Seed of the random generator (for the random choices of the bots).
+
+    Returns:
+        dict: The game record: bots, opening, result ('1-0', '0-1' or '1/2-1/2'), reason, moves (UCI) and time.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    engines = {Color.WHITE: parse_engine(white), Color.BLACK: parse_engine(black)}
+    board = Board()
+    board.from_fen(fen)
+
+    start_time = time.time()
+    moves = []
+    while game_status(board) == GameStatus.ONGOING and len(moves) < max_plies:
+        move = engines[board.color_turn](board)
+        moves.append(move.to_uci())
+        board = board.apply_move(move)
+
+    status = game_status(board)
+    if status == GameStatus.CHECKMATE:
+        result = "0-1" if board.color_turn == Color.WHITE else "1-0"
+    else:
+        result = "1/2-1/2"
+
+    return {
+        "white": white,
+        "black": black,
+        "opening": fen,
+        "result": result,
+        "reason": status.name if status != GameStatus.ONGOING else "MAX_PLIES",
+        "moves": moves,
+        "time": time.time() - start_time,
+    }
+
+
+def game_from_record(record: dict) -> Game:
+    """
+    Convert a game record to a PGN game.
+
+    Parameters:
+        record (dict): The record of a game, as returned by play_game (with its number as 'game' if known).
+
+    Returns:
+        Game: The game with its players, result and termination, starting from its opening.
+    """
+    board = Board()
+    board.from_fen(record["opening"])
+    moves = []
+    for text in record["moves"]:
+        move = next(move for move in generate_legal_moves(board) if move.to_uci() == text)
+        moves.append(move)
+        board = board.apply_move(move)
+
+    headers = {"Event": "Tournament", "White": record["white"], "Black": record["black"],
+               "Round": str(record["game"] + 1) if "game" in record else "?",
+               "Termination": record["reason"]}
+    if record["opening"] != DEFAULT_OPENINGS[0]:
+        headers["FEN"] = record["opening"]
+    return Game(headers, moves, record["result"])
+
+
+def elo_difference(wins: int, draws: int, losses: int) -> tuple:
+    """
+    Compute the Elo difference of a bot from its results and the 95% error bar.
+
+    Parameters:
+        wins (int): Number of games won.
+        draws (int): Number of draws.
+        losses (int): Number of games lost.
+
+    Returns:
+        tuple: The Elo difference and its error (infinite when the score is 0% or 100%).
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, math.inf
+
+    def to_elo(score):
+        if score <= 0:
+            return -math.inf
+        if score >= 1:
+            return math.inf
+        return -400 * math.log10(1 / score - 1)
+
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+
+    return to_elo(score), (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+
+def sprt(wins: int, draws: int, losses: int, elo0: float, elo1: float, alpha: float = 0.05, beta: float = 0.05) -> tuple:
+    """
+    Sequential probability ratio test of H0 (the Elo difference is elo0) against H1 (it is elo1),
+    with the normal approximation of the log-likelihood ratio.
+
+    Parameters:
+        wins (int): Number of games won.
+        draws (int): Number of draws.
+        losses (int): Number of games lost.
+        elo0 (float): Elo difference of the null hypothesis.
+        elo1 (float): Elo difference of the alternative hypothesis.
+        alpha (float): Probability of accepting H1 when H0 is true.
+        beta (float): Probability of accepting H0 when H1 is true.
+
+    Returns:
+        tuple: The log-likelihood ratio, the lower bound (H0 accepted below) and the upper bound (H1 accepted above).
+    """
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, lower, upper
+
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if variance == 0:
+        return 0.0, lower, upper
+
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    llr = games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+    return llr, lower, upper
+
+
+def run_tournament(engine1: str, engine2: str, games: int, openings: list = None, workers: int = None,
+                   max_plies: int = 200, output=None, sprt_elo: tuple = None, seed: int = 0, on_result=None) -> dict:
+    """
+    Play a match between two bots in a process pool.
+
+    Parameters:
+        engine1 (str): Spec of the first bot (the results are given from its point of view).
+        engine2 (str): Spec of the second bot.
+        games (int): Maximum number of games.
+        openings (list): The starting positions (FEN), each one is played with both colors.
+        workers (int): Number of processes, the number of CPUs if not given.
+        max_plies (int): Number of half moves after which a game is adjudicated as a draw.
+        output (file): File where each game record is written as a JSON line as soon as it ends.
+        sprt_elo (tuple): (elo0, elo1) to stop the match as soon as the SPRT accepts one of the hypotheses.
+        seed (int): Seed of the games (game i uses seed + i).
+        on_result (callable): Called with (record, summary) after each game.
+
+    Returns:
+        dict: Summary of the match: wins, draws and losses of engine1, Elo difference and error, SPRT state.
+    """
+    openings = openings or DEFAULT_OPENINGS
+    workers = workers or os.cpu_count()
+    summary = {"games": 0, "wins": 0, "draws": 0, "losses": 0, "elo": 0.0, "error": math.inf, "llr": None, "sprt": None}
+
+    # Game i is played from opening i // 2, engine1 has white in the even games
+    def submit(pool, index):
+        fen = openings[(index // 2) % len(openings)]
+        white, black = (engine1, engine2) if index % 2 == 0 else (engine2, engine1)
+        future = pool.submit(play_game, white, black, fen, max_plies, seed + index)
+        indexes[future] = index
+        return future
+
+    indexes = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        next_game = 0
+        while next_game < games or pending:
+            # Keep the pool busy without submitting all the games at once
+            while next_game < games and len(pending) < 2 * workers:
+                pending.add(submit(pool, next_game))
+                next_game += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = dict(game=indexes.pop(future), **future.result())
+                engine1_white = record["game"] % 2 == 0
+                if record["result"] == "1/2-1/2":
+                    summary["draws"] += 1
+                elif (record["result"] == "1-0") == engine1_white:
+                    summary["wins"] += 1
+                else:
+                    summary["losses"] += 1
+                summary["games"] += 1
+                summary["elo"], summary["error"] = elo_difference(summary["wins"], summary["draws"], summary["losses"])
+
+                if sprt_elo is not None:
+                    llr, lower, upper = sprt(summary["wins"], summary["draws"], summary["losses"], *sprt_elo)
+                    summary["llr"] = llr
+                    if llr >= upper:
+                        summary["sprt"] = "H1"
+                    elif llr <= lower:
+                        summary["sprt"] = "H0"
+
+                if output is not None:
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+                if on_result is not None:
+                    on_result(record, summary)
+
+            if summary["sprt"] is not None:
+                # The test is over: the games not started yet are cancelled
+                for future in pending:
+                    future.cancel()
+                pool.shutdown(cancel_futures=True)
+                break
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a match between two bots.")
+    parser.add_argument("engine1", help="first bot: random, minmax[:depth] or mtcs[:seconds]")
+    parser.add_argument("engine2", help="second bot")
+    parser.add_argument("--games", type=int, default=100, help="maximum number of games")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--openings", default=None, help="file with one starting FEN per line")
+    parser.add_argument("--max-plies", type=int, default=200, help="half moves before a game is adjudicated as a draw")
+    parser.add_argument("--output", default=None, help="JSONL file where the games are written as they end")
+    parser.add_argument("--pgn", default=None, help="PGN file where the games are written as they end")
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"), default=None,
+                        help="stop when the SPRT accepts elo0 or elo1")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the games")
+    args = parser.parse_args()
+
+    for spec in (args.engine1, args.engine2):
+        parse_engine(spec)
+
+    openings = None
+    if args.openings is not None:
+        with open(args.openings) as file:
+            openings = [line.strip() for line in file if line.strip()]
+
+    def on_result(record, summary):
+        line = (f"Game {summary['games']}: {record['white']} vs {record['black']} {record['result']} ({record['reason']}) | "
+                f"+{summary['wins']} ={summary['draws']} -{summary['losses']} | "
+                f"Elo {summary['elo']:.1f} +/- {summary['error']:.1f}")
+        if summary["llr"] is not None:
+            line += f" | LLR {summary['llr']:.2f}"
+        print(line, flush=True)
+        if pgn_output is not None:
+            write_game(pgn_output, game_from_record(record))
+            pgn_output.flush()
+
+    output = open(args.output, "a") if args.output else None
+    pgn_output = open(args.pgn, "a") if args.pgn else None
+    try:
+        summary = run_tournament(args.engine1, args.engine2, args.games, openings, args.workers, args.max_plies,
+                                 output, tuple(args.sprt) if args.sprt else None, args.seed, on_result)
+    finally:
+        if output is not None:
+            output.close()
+        if pgn_output is not None:
+            pgn_output.close()
+
+    print(f"{args.engine1} vs {args.engine2}: +{summary['wins']} ={summary['draws']} -{summary['losses']}, "
+          f"Elo {summary['elo']:.1f} +/- {summary['error']:.1f}"
+          + (f", SPRT {summary['sprt'] or 'inconclusive'}" if args.sprt else ""))
+
+
+if __name__ == "__main__":
+    main()
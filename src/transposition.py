@@ -0,0 +1,58 @@
+"""
+transposition.py - Transposition Table
+
+This module defines the transposition table used by the search to remember the results of positions already searched.
+The entries are keyed by the Zobrist hash of the position and hold the searched depth, the score, the kind of bound
+of the score and the best move found, so the search can reuse a score or try the best move first.
+"""
+
+from enums import Bound
+
+
+class TranspositionTable:
+    def __init__(self, max_entries: int = 1 << 20):
+        """
+        Create an empty transposition table.
+
+        Parameters:
+            max_entries (int): Maximum number of positions stored, the oldest entries are replaced first.
+        """
+        self.entries = {}
+        self.max_entries = max_entries
+
+    def probe(self, key: int):
+        """
+        Get the entry of a position.
+
+        Parameters:
+            key (int): The hash of the position.
+
+        Returns:
+            tuple or None: (depth, score, bound, move) if the position is stored, None otherwise.
+        """
+        return self.entries.get(key)
+
+    def store(self, key: int, depth: int, score: float, bound: Bound, move) -> None:
+        """
+        Store the result of the search of a position.
+
+        Parameters:
+            key (int): The hash of the position.
+            depth (int): The depth the position was searched to.
+            score (float): The score found by the search.
+            bound (Bound): Whether the score is exact, a lower bound (fail high) or an upper bound (fail low).
+            move (Move): The best move found, or None.
+        """
+        if key not in self.entries and len(self.entries) >= self.max_entries:
+            # Dictionaries keep the insertion order: the first key is the oldest entry
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = (depth, score, bound, move)
+
+    def clear(self) -> None:
+        """
+        Remove all the entries.
+        """
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
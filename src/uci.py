@@ -0,0 +1,290 @@
+"""
+uci.py - Universal Chess Interface
+
+This file implements the UCI protocol, so the engine can be driven by chess GUIs, analysis tools and match runners.
+The commands are read from the standard input and the answers written to the standard output:
+
+    python src/uci.py
+
+The search runs in a background thread, so the commands (isready, stop, quit) are still handled while it thinks.
+With 'go ponder', the engine searches the expected position on the opponent's time: on 'ponderhit' the same search
+goes on with its time limit, on 'stop' (the opponent played another move) its result is dropped by the GUI.
+The transposition table is kept between the moves of a game.
+"""
+
+import sys
+import threading
+import profiler
+from board import *
+from minmax import *
+from bench import run_bench, BENCH_DEPTH
+
+ENGINE_NAME = "Kaspich"
+ENGINE_AUTHOR = "Julian Gil"
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Maximum number of lines of the multi-PV analysis
+MAX_MULTIPV = 64
+
+# Number of moves assumed to be left in the game when the time control does not give it
+DEFAULT_MOVES_TO_GO = 30
+
+
+def parse_move(board: Board, text: str) -> Move:
+    """
+    Find the legal move corresponding to a move in UCI notation.
+
+    Parameters:
+        board (Board): The current chessboard state.
+        text (str): The move in UCI notation, e.g. 'e2e4' or 'e7e8q'.
+
+    Returns:
+        Move: The legal move (with its en-passant, castling and promotion information).
+
+    Raises:
+        ValueError: If the move is not legal on the board.
+    """
+    for move in generate_legal_moves(board):
+        if move.to_uci() == text:
+            return move
+    raise ValueError(f"Illegal move '{text}'")
+
+
+def score_to_uci(score) -> str:
+    """
+    Convert a score of the search (in pawns) to the UCI notation: centipawns, or moves before the mate
+    (negative if the engine is mated).
+    """
+    moves = mate_in(score)
+    if moves is not None:
+        return "mate %d" % moves
+    return "cp %d" % int(round(float(score) * 100))
+
+
+class UCI:
+    def __init__(self, input_stream=sys.stdin, output_stream=sys.stdout):
+        """
+        Create the UCI front end of the engine.
+
+        Parameters:
+            input_stream: Where the commands are read from (a file-like object).
+            output_stream: Where the answers are written to (a file-like object).
+        """
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.output_lock = threading.Lock()
+        self.search = Search()
+        self.thread = None
+        self.infinite = False
+        self.multipv = 1
+        self.board = Board()
+        self.board.from_fen(START_FEN)
+
+    def send(self, line: str) -> None:
+        """
+        Write one line to the output (from the main thread or from the search thread).
+        """
+        with self.output_lock:
+            self.output_stream.write(line + "\n")
+            self.output_stream.flush()
+
+    def loop(self) -> None:
+        """
+        Read and handle the commands until 'quit' or the end of the input.
+        At the end of the input, a search with a depth or time limit is finished before leaving.
+        """
+        for line in self.input_stream:
+            if not self.handle(line.strip()):
+                self.stop()
+                return
+
+        if self.thread is not None and not self.infinite and not self.search.pondering:
+            self.thread.join()
+        self.stop()
+
+    def handle(self, line: str) -> bool:
+        """
+        Handle one command.
+
+        Parameters:
+            line (str): The command line.
+
+        Returns:
+            bool: False if the engine has to quit, True otherwise.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+
+        command = tokens[0]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("option name Ponder type check default false")
+            self.send(f"option name MultiPV type spin default 1 min 1 max {MAX_MULTIPV}")
+            self.send("option name SearchStats type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.stop()
+            self.set_option(tokens[1:])
+        elif command == "ucinewgame":
+            self.stop()
+            self.search.tt.clear()
+        elif command == "position":
+            self.stop()
+            self.position(tokens[1:])
+        elif command == "go":
+            self.stop()
+            self.go(tokens[1:])
+        elif command == "ponderhit":
+            self.search.ponderhit()
+        elif command == "stop":
+            self.stop()
+        elif command == "bench":
+            self.stop()
+            self.bench(tokens[1:])
+        elif command == "quit":
+            return False
+        return True
+
+    def set_option(self, tokens: list) -> None:
+        """
+        Set an option of the engine: 'setoption name <name> [value <value>]'.
+        SearchStats (true/false) sends the statistics of the search after each depth,
+        MultiPV (1 to MAX_MULTIPV) is the number of best moves sent with their scores and lines.
+        """
+        if "name" not in tokens:
+            return
+        name_end = tokens.index("value") if "value" in tokens else len(tokens)
+        name = " ".join(tokens[tokens.index("name") + 1:name_end])
+        value = " ".join(tokens[name_end + 1:])
+
+        if name.lower() == "searchstats":
+            self.search.stats = SearchStats() if value.lower() == "true" else None
+        elif name.lower() == "multipv":
+            self.multipv = min(max(int(value), 1), MAX_MULTIPV)
+
+    def position(self, tokens: list) -> None:
+        """
+        Set up the position: 'position [startpos | fen <fen>] [moves <move1> ... <moveN>]'.
+        """
+        moves = []
+        if "moves" in tokens:
+            index = tokens.index("moves")
+            tokens, moves = tokens[:index], tokens[index + 1:]
+
+        board = Board()
+        if tokens and tokens[0] == "fen":
+            board.from_fen(" ".join(tokens[1:]))
+        else:
+            board.from_fen(START_FEN)
+
+        for text in moves:
+            board = board.apply_move(parse_move(board, text))
+
+        self.board = board
+
+    def go(self, tokens: list) -> None:
+        """
+        Start searching the current position in the background thread:
+        'go [ponder] [depth <d>] [movetime <ms>] [wtime <ms>] [btime <ms>] [winc <ms>] [binc <ms>] [movestogo <n>]
+        [infinite]'.
+        """
+        options = {}
+        infinite = False
+        ponder = False
+        for name, value in zip(tokens, tokens[1:] + [None]):
+            if name == "infinite":
+                infinite = True
+            elif name == "ponder":
+                ponder = True
+            elif name in ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo") and value is not None:
+                options[name] = int(value)
+
+        max_depth = options.get("depth")
+        time_limit = None
+        if "movetime" in options:
+            time_limit = options["movetime"] / 1000
+        elif not infinite:
+            remaining = options.get("wtime" if self.board.color_turn == Color.WHITE else "btime")
+            increment = options.get("winc" if self.board.color_turn == Color.WHITE else "binc", 0)
+            if remaining is not None:
+                moves_to_go = options.get("movestogo", DEFAULT_MOVES_TO_GO)
+                time_limit = min(remaining / moves_to_go + increment / 2, remaining / 2) / 1000
+
+        self.infinite = infinite and max_depth is None
+        # Set before the thread starts, so a ponderhit sent right after cannot be lost
+        self.search.pondering = ponder
+        self.thread = threading.Thread(target=self.think, args=(self.board, max_depth, time_limit, self.infinite), daemon=True)
+        self.thread.start()
+
+    def think(self, board: Board, max_depth: int, time_limit: float, infinite: bool) -> None:
+        """
+        Search the position (in the search thread), send the info lines, the best move and the expected answer.
+        """
+        def send_info(depth, lines, search):
+            elapsed = search.elapsed()
+            nps = int(search.nodes / elapsed) if elapsed > 0 else 0
+            for index, (_, score, pv) in enumerate(lines):
+                multipv = f" multipv {index + 1}" if self.multipv > 1 else ""
+                self.send(f"info depth {depth}{multipv} score {score_to_uci(score)} nodes {search.nodes} nps {nps} "
+                          f"time {int(elapsed * 1000)} pv {' '.join(pv_move.to_uci() for pv_move in pv)}")
+            if search.stats is not None:
+                self.send(f"info string stats {search.stats}")
+
+        if self.search.stats is not None:
+            self.search.stats.reset()
+        if self.multipv > 1:
+            lines, _ = analyse(board, max_depth, time_limit, self.multipv, self.search, send_info)
+            move = lines[0][0] if lines else None
+        else:
+            def info(depth, score, move, search):
+                send_info(depth, [(move, score, search.principal_variation)], search)
+
+            move, _, _ = iterative_deepening(board, max_depth, time_limit, self.search, info)
+
+        # In infinite mode the best move is only sent after the stop command, and when pondering after the ponderhit
+        if infinite:
+            self.search.stop_event.wait()
+        while self.search.pondering and not self.search.stop_event.wait(0.01):
+            pass
+
+        pv = self.search.principal_variation
+        if move is None:
+            self.send("bestmove 0000")
+        elif len(pv) > 1 and pv[0] == move:
+            self.send(f"bestmove {move.to_uci()} ponder {pv[1].to_uci()}")
+        else:
+            self.send(f"bestmove {move.to_uci()}")
+
+    def bench(self, tokens: list) -> None:
+        """
+        Search the bench positions: 'bench [depth]'. The position and the transposition table are not changed.
+        """
+        result = run_bench(int(tokens[0]) if tokens else BENCH_DEPTH, iterations=1)
+        self.send(f"info string bench depth {result['depth']} positions {result['positions']} "
+                  f"time {int(result['time'] * 1000)}")
+        self.send(f"info string bench nodes {result['nodes']} nps {result['nps']}")
+
+    def stop(self) -> None:
+        """
+        Stop the running search (if any) and wait for its best move to be sent.
+        """
+        if self.thread is not None:
+            # Ask again until the thread ends, in case the search had not started yet when first asked
+            while self.thread.is_alive():
+                self.search.stop()
+                self.thread.join(0.01)
+            self.thread = None
+
+
+def main():
+    profiler.enable_from_environment()
+    UCI().loop()
+
+
+if __name__ == "__main__":
+    main()
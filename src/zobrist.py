@@ -0,0 +1,62 @@
+"""
+zobrist.py - Zobrist Hashing
+
+This module provides the random keys used to compute Zobrist hashes of chess positions.
+A Zobrist hash is the XOR of one random key per (color, piece, square) plus keys for the side to move and the
+en-passant file, so it can be updated incrementally when a piece is set or cleared on the board.
+"""
+
+import numpy as np
+from enums import Color, PieceType
+import utils
+
+# Fixed seed so that hashes are reproducible between runs (needed to compare or store hashes)
+_RNG = np.random.default_rng(0x4B415350)
+
+# Precompute one random key for each color, piece type and square: PIECE_KEYS[color][piece][square]
+PIECE_KEYS = _RNG.integers(0, 2**64, size=(2, 6, 64), dtype=np.uint64)
+
+# Key toggled when it is black to move
+SIDE_KEY = _RNG.integers(0, 2**64, dtype=np.uint64)
+
+# One key per file of the pawn that can be taken en-passant
+EN_PASSANT_KEYS = _RNG.integers(0, 2**64, size=8, dtype=np.uint64)
+
+
+def en_passant_key(board) -> np.uint64:
+    """
+    Get the en-passant part of the hash for the given board.
+
+    Parameters:
+        board (Board): The chessboard state.
+
+    Returns:
+        np.uint64: The key of the file of the pawn which can be taken en-passant, or 0 if there is none.
+    """
+    # The pawn that can be taken is the one the opponent of the side to move has just double pushed
+    square = board.en_passant_square[Color.WHITE if board.color_turn == Color.BLACK else Color.BLACK]
+    if square is None:
+        return np.uint64(0)
+    return EN_PASSANT_KEYS[square.file]
+
+
+def compute_hash(board) -> np.uint64:
+    """
+    Compute the Zobrist hash of the board from scratch.
+
+    Parameters:
+        board (Board): The chessboard state.
+
+    Returns:
+        np.uint64: The Zobrist hash of the position.
+    """
+    h = np.uint64(0)
+    for color in Color:
+        for piece in PieceType:
+            for square in utils.occupied_squares(board.get_piece_bb(piece, color)):
+                h ^= PIECE_KEYS[color][piece][square.position]
+
+    if board.color_turn == Color.BLACK:
+        h ^= SIDE_KEY
+
+    return h ^ en_passant_key(board)
@@ -0,0 +1,64 @@
+import unittest
+from io import StringIO
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from batch_analysis import *
+
+POSITIONS = [
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+    "",
+    "# comment",
+    '8/5kp1/8/8/8/8/5KP1/8 b - - bm Kf6; id "pawns";',
+    "not a position",
+    "k7/8/1K6/8/8/8/8/7R b - - 0 1",
+]
+
+
+class TestBatchAnalysis(unittest.TestCase):
+    def test_parse_position(self) -> None:
+        """
+        Test if the FEN and the EPD lines are read with the EPD operations.
+        """
+        self.assertEqual(parse_position(POSITIONS[0]), (POSITIONS[0], {}))
+        self.assertEqual(parse_position(POSITIONS[3]), ("8/5kp1/8/8/8/8/5KP1/8 b - - 0 1", {"bm": "Kf6", "id": "pawns"}))
+        self.assertEqual(parse_position("8/8/8/8/8/8/8/K6k w - - hmvc 12; fmvn 40;")[0], "8/8/8/8/8/8/8/K6k w - - 12 40")
+
+    def test_analyse_position(self) -> None:
+        """
+        Test if a position is analysed and an invalid one gives an error.
+        """
+        record = analyse_position(POSITIONS[0], depth=1)
+        self.assertEqual((record["move"], record["mate"], record["depth"]), ("a1a8", 1, 1))
+        self.assertGreater(record["nodes"], 0)
+
+        self.assertIn("error", analyse_position(POSITIONS[4], depth=1))
+
+    def test_analyse_batch(self) -> None:
+        """
+        Test if the results are given in the input order, with the number of lines done after each one.
+        """
+        done = []
+        records = list(analyse_batch(StringIO("\n".join(POSITIONS)), depth=1, workers=2, progress=done.append))
+
+        self.assertEqual([record["line"] for record in records], [0, 3, 4, 5])
+        self.assertEqual(records[1]["epd"]["id"], "pawns")
+        self.assertIn("error", records[2])
+        self.assertEqual(done, [3, 4, 5, 6, 6])
+
+    def test_analyse_batch_resume(self) -> None:
+        """
+        Test if the analysis starts after the lines done and gives all the results in completed order.
+        """
+        records = list(analyse_batch(StringIO("\n".join(POSITIONS)), depth=1, workers=2, ordered=False, start=3))
+
+        self.assertEqual(sorted(record["line"] for record in records), [3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from bench import *
+
+class TestBench(unittest.TestCase):
+    def test_node_signature(self) -> None:
+        """
+        Test if the number of nodes searched by the bench is the same from one run to another.
+        """
+        first = run_bench(1, BENCH_FENS[:4], iterations=1)
+        second = run_bench(1, BENCH_FENS[:4], iterations=1)
+        self.assertEqual(first["positions"], 4)
+        self.assertGreater(first["nodes"], 0)
+        self.assertEqual(first["nodes"], second["nodes"])
+
+    def test_sections(self) -> None:
+        """
+        Test if every hot function is timed, with one apply_move call per legal move.
+        """
+        board = Board()
+        board.from_fen(BENCH_FENS[0])
+        sections = time_sections([board], iterations=2)
+        self.assertEqual(set(sections), {"move_generation", "apply_move", "evaluate", "is_game_over"})
+        self.assertEqual(sections["move_generation"]["calls"], 2)
+        self.assertEqual(sections["apply_move"]["calls"], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
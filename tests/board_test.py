@@ -9,8 +9,9 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.join(current_dir, "..", "src")
 sys.path.insert(0, src_dir)
 
-from board import Board
+from board import *
 from enums import Color
+import zobrist
 
 class TestBoard(unittest.TestCase):
     def setUp(self) -> None:
@@ -67,6 +68,104 @@ class TestBoard(unittest.TestCase):
         # Compare the printed output with the expected board representation
         self.assertEqual(output, expected_output)
 
+    def test_incremental_hash(self) -> None:
+        """
+        Test if the hash updated by apply_move matches the hash computed from scratch, and if transpositions share it.
+        """
+        def play(board, moves):
+            for move in moves:
+                board = board.apply_move(Move(Square.from_string(move[:2]), Square.from_string(move[2:])))
+                self.assertEqual(board.hash, zobrist.compute_hash(board))
+            return board
+
+        first = play(self.board, ["e2e4", "e7e5", "g1f3", "b8c6"])
+        second = play(self.board, ["g1f3", "e7e5", "e2e4", "b8c6"])
+        self.assertEqual(first.hash, second.hash)
+
+        # The en-passant possibility is part of the position
+        double_push = play(self.board, ["e2e4"])
+        double_push.en_passant_square[Color.WHITE] = None
+        self.assertNotEqual(double_push.hash, zobrist.compute_hash(double_push))
+    def test_game_status(self) -> None:
+        """
+        Test if game_status finds checkmate, stalemate and insufficient material, and caches the result.
+        """
+        expected = {
+            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1": GameStatus.ONGOING,
+            "R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1": GameStatus.CHECKMATE,
+            "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1": GameStatus.STALEMATE,
+            "8/8/8/8/8/2k5/8/K1B5 w - - 0 1": GameStatus.INSUFFICIENT_MATERIAL,
+            "8/8/8/8/8/2k3b1/8/K1B5 w - - 0 1": GameStatus.INSUFFICIENT_MATERIAL,
+            "8/8/8/8/8/2k2b2/8/K1B5 w - - 0 1": GameStatus.ONGOING,
+        }
+        for fen, status in expected.items():
+            board = Board()
+            board.from_fen(fen)
+            self.assertEqual(game_status(board), status, fen)
+            self.assertEqual(board.status, status)
+
+        board = Board()
+        board.from_fen("R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1")
+        self.assertTrue(is_checkmate(board))
+        self.assertFalse(is_draw(board))
+        self.assertEqual(get_outcome(board), Color.WHITE)
+    def test_fen_round_trip(self) -> None:
+        """
+        Test if the en-passant square and the clocks are kept by from_fen and to_fen.
+        """
+        for fen in ["4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 3",
+                    "4k3/8/8/8/3Pp3/8/8/4K3 b - d3 0 1",
+                    "4k3/8/8/8/8/8/8/4K2R w K - 37 80"]:
+            board = Board()
+            board.from_fen(fen)
+            self.assertEqual(board.to_fen(), fen)
+
+    def test_repetition_and_fifty_moves(self) -> None:
+        """
+        Test if the halfmove clock and the history detect the threefold repetition and the fifty-move rule.
+        """
+        board = self.board
+        for move in ["g1f3", "g8f6", "f3g1", "f6g8"] * 2:
+            self.assertEqual(game_status(board), GameStatus.ONGOING)
+            board = board.apply_move(Move(Square.from_string(move[:2]), Square.from_string(move[2:])))
+
+        self.assertEqual(board.halfmove_clock, 8)
+        self.assertEqual(board.fullmove_number, 5)
+        self.assertEqual(board.repetition_count(), 2)
+        self.assertEqual(game_status(board), GameStatus.REPETITION)
+
+        # A pawn move resets the clock and the history
+        board = board.apply_move(Move(Square.from_string("e2"), Square.from_string("e4")))
+        self.assertEqual((board.halfmove_clock, board.history), (0, ()))
+
+        board = Board()
+        board.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 100 90")
+        self.assertEqual(game_status(board), GameStatus.FIFTY_MOVES)
+
+    def test_null_move(self) -> None:
+        """
+        Test if a null move passes the turn, removes the en-passant capture and keeps the hash up to date.
+        """
+        board = self.board.apply_move(Move(Square.from_string("e2"), Square.from_string("e4")))
+        null_board = board.apply_null_move()
+
+        self.assertEqual(null_board.color_turn, Color.WHITE)
+        self.assertEqual(null_board.en_passant_square, {Color.WHITE: None, Color.BLACK: None})
+        self.assertEqual(null_board.hash, zobrist.compute_hash(null_board))
+        self.assertEqual(null_board.history, ())
+        self.assertEqual(null_board.to_fen().split()[0], board.to_fen().split()[0])
+
+    def test_is_in_check(self) -> None:
+        """
+        Test the check detection and the material used to avoid null moves in pawn endgames.
+        """
+        board = Board()
+        board.from_fen("4k3/8/8/8/8/8/3P4/4RK2 b - - 0 1")
+        self.assertTrue(board.is_in_check())
+        self.assertFalse(board.has_non_pawn_material())
+        self.assertFalse(self.board.is_in_check())
+        self.assertTrue(self.board.has_non_pawn_material())
+
 if __name__ == "__main__":
     # Run the test cases
     unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from chess_bot import *
+
+
+class TestPlayers(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Set up a pawn endgame, quick to search.
+        """
+        random.seed(0)
+        self.board = Board()
+        self.board.from_fen("8/5kp1/8/8/8/8/5KP1/8 w - - 0 1")
+
+    def test_minmax_ponder_hit(self) -> None:
+        """
+        Test if the pondering search is used when the opponent plays the expected answer.
+        """
+        player = MinmaxPlayer(depth=2)
+        board = player(self.board)
+        self.assertIsNotNone(player.thread)
+
+        expected = board.apply_move(player.ponder_move)
+        move, _, depth = player.finish_ponder(expected)
+
+        self.assertEqual(player.ponder_hits, 1)
+        self.assertEqual(player.ponder_misses, 0)
+        self.assertGreaterEqual(depth, 2)
+        self.assertIn(move, list(generate_legal_moves(expected)))
+        self.assertIsNone(player.thread)
+
+    def test_minmax_ponder_miss(self) -> None:
+        """
+        Test if a ponder miss stops the pondering search and searches the real position.
+        """
+        player = MinmaxPlayer(depth=2)
+        board = player(self.board)
+
+        answer = next(move for move in generate_legal_moves(board) if move != player.ponder_move)
+        board = board.apply_move(answer)
+        move = player.move(board)
+        player.stop()
+
+        self.assertEqual(player.ponder_hits, 0)
+        self.assertEqual(player.ponder_misses, 1)
+        self.assertIn(move, list(generate_legal_moves(board)))
+
+    def test_minmax_depth_or_time(self) -> None:
+        """
+        Test if a player without depth nor time limit is refused.
+        """
+        with self.assertRaises(ValueError):
+            MinmaxPlayer(depth=None)
+
+    def test_mtcs_keeps_tree(self) -> None:
+        """
+        Test if the tree is kept and searched while the opponent thinks.
+        """
+        player = MTCSPlayer(time_limit=0.2)
+        board = player(self.board)
+        root = player.mcts.root
+        player.thread.join(0.2)
+        self.assertGreater(root.N, 0)
+
+        board = board.apply_move(next(generate_legal_moves(board)))
+        player(board)
+        player.stop()
+
+        self.assertEqual(player.reused_trees, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
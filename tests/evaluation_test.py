@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from evaluation import *
+
+class TestEvaluation(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Set up a few positions for each test case.
+        """
+        self.start = Board()
+        self.start.board_initialization()
+        self.italian = Board()
+        self.italian.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+        self.rook_up = Board()
+        self.rook_up.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+
+    def test_mobility_batch(self) -> None:
+        """
+        Test if the vectorized mobility matches the move generation of each piece.
+        """
+        generators = {
+            PieceType.KNIGHT: generate_knight_moves,
+            PieceType.BISHOP: generate_bishop_moves,
+            PieceType.ROOK: generate_rook_moves,
+            PieceType.QUEEN: generate_queen_moves,
+            PieceType.KING: generate_king_moves,
+        }
+        boards = [self.start, self.italian, self.rook_up]
+        mobility = mobility_batch(np.stack([board.bitboards() for board in boards]))
+
+        for board, moves in zip(boards, mobility):
+            for color in Color:
+                board.color_turn = color
+                expected = sum(int(pop_count(generator(board, square)))
+                               for piece, generator in generators.items()
+                               for square in utils.occupied_squares(board.get_piece_bb(piece, color)))
+                self.assertEqual(moves[color], expected)
+
+    def test_evaluate_batch(self) -> None:
+        """
+        Test if the scores are symmetric and seen from the color to move.
+        """
+        bitboards = np.stack([self.start.bitboards(), self.rook_up.bitboards(), self.rook_up.bitboards()])
+        scores = evaluate_batch(bitboards, np.array([Color.WHITE, Color.WHITE, Color.BLACK]))
+
+        self.assertEqual(scores[0], 0)
+        self.assertGreater(scores[1], Heuristic.ROOK.value - 1)
+        self.assertEqual(scores[1], -scores[2])
+
+if __name__ == "__main__":
+    unittest.main()
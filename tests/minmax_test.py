@@ -0,0 +1,240 @@
+import unittest
+import json
+from io import StringIO
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from minmax import *
+
+def play(board, moves):
+    """
+    Apply a list of moves written as 'e2e4' to the board.
+    """
+    for move in moves:
+        board = board.apply_move(Move(Square.from_string(move[:2]), Square.from_string(move[2:])))
+    return board
+
+
+class TestMinmax(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Set up the Board instance and initialize the chessboard for each test case.
+        """
+        self.board = Board()
+        self.board.board_initialization()
+
+    def test_repetition_is_a_draw(self) -> None:
+        """
+        Test if the search scores a repeated position as a draw.
+        """
+        board = Board()
+        board.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+        board = play(board, ["a1a2", "e8d8", "a2a1", "d8e8"])
+
+        self.assertTrue(board.is_repetition())
+        self.assertEqual(minimax(board, 2, -1000000, 1000000), 0)
+
+    def test_fifty_moves_is_a_draw(self) -> None:
+        """
+        Test if the search scores a position after fifty moves without capture or pawn move as a draw.
+        """
+        board = Board()
+        board.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 100 90")
+        self.assertEqual(minimax(board, 2, -1000000, 1000000), 0)
+
+    def test_iterative_deepening(self) -> None:
+        """
+        Test if iterative deepening finds a mate in one and stores the best move in the transposition table.
+        """
+        board = Board()
+        board.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        search = Search()
+        move, _, depth = iterative_deepening(board, max_depth=2, search=search)
+
+        self.assertEqual(move.to_uci(), "a1a8")
+        self.assertEqual(depth, 2)
+        self.assertEqual(search.tt.probe(int(board.hash))[3], move)
+
+    def test_search_stats(self) -> None:
+        """
+        Test if the statistics count every node of the search and can be written as JSON.
+        """
+        board = Board()
+        board.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        search = Search()
+        stats = SearchStats()
+        best_move(board, 2, search, stats=stats)
+
+        self.assertEqual(stats.total("nodes"), search.nodes)
+        self.assertEqual(stats.total("eval_calls"), stats.plies[2]["nodes"])
+        self.assertGreater(stats.total("beta_cutoffs"), 0)
+        self.assertLessEqual(stats.first_move_cutoff_rate(), 1)
+
+        output = StringIO()
+        stats.dump(output)
+        data = json.loads(output.getvalue())
+        self.assertEqual(data["nodes"], search.nodes)
+        self.assertEqual([ply["ply"] for ply in data["plies"] if ply["nodes"]], [1, 2])
+
+    def test_principal_variation(self) -> None:
+        """
+        Test if the principal variation starts with the best move and is a sequence of legal moves.
+        """
+        board = Board()
+        board.from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1")
+        pv = []
+        move = best_move(board, 3, pv=pv)
+
+        self.assertEqual(pv[0], move)
+        self.assertGreaterEqual(len(pv), 3)
+        for pv_move in pv:
+            self.assertIn(pv_move, list(generate_legal_moves(board)))
+            board = board.apply_move(pv_move)
+
+    def test_pvs_score(self) -> None:
+        """
+        Test if the principal variation search gives the same score as a plain alpha-beta search
+        (in a pawn endgame without checks, so there is no extension or null move).
+        """
+        board = Board()
+        board.from_fen("8/5kp1/8/8/8/8/5KP1/8 w - - 0 1")
+        score, _ = search_root(board, 3, Search())
+
+        def alpha_beta(board, depth, alpha, beta):
+            if depth == 0:
+                return evaluate(board)
+            for move in generate_legal_moves(board):
+                alpha = max(alpha, -alpha_beta(board.apply_move(move), depth - 1, -beta, -alpha))
+                if alpha >= beta:
+                    break
+            return alpha
+
+        self.assertAlmostEqual(score, alpha_beta(board, 3, -1000000, 1000000))
+
+    def test_aspiration_windows(self) -> None:
+        """
+        Test if a search whose score falls outside the aspiration window is searched again to the exact score.
+        """
+        board = Board()
+        board.from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1")
+        expected, _ = search_root(board, 3, Search())
+
+        for previous_score, counter in ((expected + 5, "aspiration_fail_lows"), (expected - 5, "aspiration_fail_highs")):
+            search = Search(stats=SearchStats())
+            with self.assertLogs("minmax", "DEBUG"):
+                score, move = aspiration_search(board, 3, previous_score, search)
+
+            self.assertAlmostEqual(score, expected)
+            self.assertEqual(search.principal_variation[0], move)
+            self.assertGreater(search.stats.total(counter), 0)
+
+    def test_null_move_pruning(self) -> None:
+        """
+        Test if a null move cuts a winning position, but not a pawn endgame where zugzwang is possible.
+        """
+        for fen, cutoffs in (("4k3/8/8/8/8/8/3Q4/4K3 w - - 0 1", 1), ("4k3/8/8/8/8/8/3P4/4K3 w - - 0 1", 0)):
+            board = Board()
+            board.from_fen(fen)
+            search = Search(stats=SearchStats())
+            score = minimax(board, 3, 0, NULL_WINDOW, search)
+
+            self.assertEqual(search.stats.total("null_move_cutoffs"), cutoffs)
+            if cutoffs:
+                self.assertEqual(score, NULL_WINDOW)
+
+    def test_late_move_reductions(self) -> None:
+        """
+        Test if the late quiet moves are reduced and still give a legal best move.
+        """
+        board = Board()
+        board.from_fen("8/5kp1/8/8/8/8/5KP1/8 w - - 0 1")
+        search = Search(stats=SearchStats())
+        move, _, depth = iterative_deepening(board, max_depth=4, search=search)
+
+        self.assertEqual(depth, 4)
+        self.assertIn(move, list(generate_legal_moves(board)))
+        self.assertGreater(search.stats.total("lmr_reductions"), 0)
+
+    def test_mate_scores(self) -> None:
+        """
+        Test if the mates are scored by their distance: a mate in two is found and scored below a mate in one.
+        """
+        board = Board()
+        board.from_fen("r1b2k1r/ppp1bppp/8/1B1Q4/5q2/2P5/PPP2PPP/R3R1K1 w - - 1 1")
+        search = Search()
+        move, score, _ = iterative_deepening(board, max_depth=3, search=search)
+
+        self.assertEqual(move.to_uci(), "d5d8")
+        self.assertEqual(score, MATE_SCORE - 3)
+        self.assertEqual(mate_in(score), 2)
+        self.assertEqual([pv_move.to_uci() for pv_move in search.principal_variation], ["d5d8", "e7d8", "e1e8"])
+
+        # The side being mated sees the mate too
+        mated = board.apply_move(move)
+        self.assertEqual(mate_in(search_root(mated, 2, Search())[0]), -1)
+
+    def test_mate_search(self) -> None:
+        """
+        Test if the mate search finds the shortest mate and nothing when there is no mate.
+        """
+        board = Board()
+        board.from_fen("r2qkb1r/pp2nppp/3p4/2pNN1B1/2BnP3/3P4/PPP2PPP/R2bK2R w KQkq - 1 1")
+        self.assertIsNone(mate_search(board, 1))
+        self.assertEqual(mate_search(board, 2).to_uci(), "d5f6")
+        self.assertIsNone(mate_search(self.board, 2))
+
+    def test_stalemate_is_a_draw(self) -> None:
+        """
+        Test if a stalemate is scored as a draw, at the leaves too.
+        """
+        board = Board()
+        board.from_fen("k7/2Q5/1K6/8/8/8/8/8 b - - 0 1")
+        self.assertEqual(minimax(board, 1, -INFINITY, INFINITY), 0)
+        self.assertEqual(evaluate(board), 0)
+
+    def test_stop_search(self) -> None:
+        """
+        Test if a stopped search still returns a legal move.
+        """
+        search = Search()
+        move, score, depth = iterative_deepening(self.board, time_limit=0, search=search)
+
+        self.assertIn(move, list(generate_legal_moves(self.board)))
+        self.assertEqual((score, depth), (None, 0))
+
+    def test_analyse(self) -> None:
+        """
+        Test if the multi-PV analysis finds distinct moves sorted by score, the first one being the best move.
+        """
+        board = Board()
+        board.from_fen("8/5kp1/8/8/8/8/5KP1/8 w - - 0 1")
+        move, score, _ = iterative_deepening(board, 2)
+
+        lines, depth = analyse(board, 2, multipv=3)
+
+        self.assertEqual(depth, 2)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0][:2], (move, score))
+        self.assertEqual(len({line[0].to_uci() for line in lines}), 3)
+        self.assertEqual([line[1] for line in lines], sorted((line[1] for line in lines), reverse=True))
+        for line_move, _, pv in lines:
+            self.assertEqual(pv[0], line_move)
+
+    def test_analyse_all_moves(self) -> None:
+        """
+        Test if the analysis stops at the number of legal moves.
+        """
+        board = Board()
+        board.from_fen("k7/8/1K6/8/8/8/8/7R b - - 0 1")
+        lines, _ = analyse(board, 1, multipv=10)
+
+        self.assertEqual(sorted(line[0].to_uci() for line in lines), ["a8b8"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from mtcs import *
+
+def play(board, moves):
+    """
+    Apply a list of moves written as 'e2e4' to the board.
+    """
+    for move in moves:
+        board = board.apply_move(Move(Square.from_string(move[:2]), Square.from_string(move[2:])))
+    return board
+
+
+class TestMTCS(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Set up the Board instance and initialize the chessboard for each test case.
+        """
+        random.seed(0)
+        self.board = Board()
+        self.board.board_initialization()
+
+    def test_move_reuses_child(self) -> None:
+        """
+        Test if playing an expanded move keeps its node as the new root.
+        """
+        mcts = MTCS(self.board)
+        mcts.expand(mcts.root, mcts.root_state)
+        child = mcts.root.children["g1f3"]
+
+        mcts.move(Move(Square.from_string("g1"), Square.from_string("f3")))
+
+        self.assertIs(mcts.root, child)
+        self.assertIsNone(mcts.root.parent)
+
+    def test_transpositions_share_node(self) -> None:
+        """
+        Test if two move orders reaching the same position give the same node.
+        """
+        mcts = TranspositionMTCS(self.board)
+        first = play(self.board, ["g1f3", "g8f6", "b1c3", "b8c6"])
+        second = play(self.board, ["b1c3", "b8c6", "g1f3", "g8f6"])
+
+        self.assertIs(mcts.node(first), mcts.node(second))
+        self.assertEqual(len(mcts.table), 2)
+
+    def test_backpropagate_alternates_sides(self) -> None:
+        """
+        Test if the rewards are seen from the point of view of the player making each move.
+        """
+        mcts = TranspositionMTCS(self.board)
+        path, node, state, is_cycle = mcts.select()
+        mcts.backpropagate(path, node, 1)
+
+        parent, edge = path[-1]
+        self.assertFalse(is_cycle)
+        self.assertEqual((edge.N, edge.Q), (1, -1))
+        self.assertEqual((node.N, node.Q), (1, 1))
+        self.assertEqual(parent.value(), -1)
+
+    def test_find_mate_in_one(self) -> None:
+        """
+        Test if the search finds a back rank mate and keeps the statistics after the move.
+        """
+        board = Board()
+        board.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        mcts = TranspositionMTCS(board, max_rollout_plies=4)
+        mcts.mtcs_search(4)
+
+        best = mcts.choose_best_move()
+        self.assertEqual(str(best), "a1a8")
+
+        mcts.move(best)
+        self.assertIs(mcts.root, mcts.table[int(mcts.root_state.hash)])
+        self.assertGreater(mcts.root.N, 0)
+
+    def test_virtual_loss_is_removed(self) -> None:
+        """
+        Test if removing the virtual loss restores the statistics of the selected line.
+        """
+        mcts = BatchedMTCS(self.board)
+        path, node, _, _ = mcts.select()
+        before = [(parent.N, parent.Q, edge.N, edge.Q) for parent, edge in path] + [(node.N, node.Q)]
+
+        mcts.apply_virtual_loss(path, node, 1)
+        self.assertEqual(path[0][1].N, 1)
+        mcts.apply_virtual_loss(path, node, -1)
+
+        after = [(parent.N, parent.Q, edge.N, edge.Q) for parent, edge in path] + [(node.N, node.Q)]
+        self.assertEqual(before, after)
+
+    def test_batched_find_mate_in_one(self) -> None:
+        """
+        Test if the batched search finds a back rank mate.
+        """
+        board = Board()
+        board.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        mcts = BatchedMTCS(board, batch_size=8)
+        mcts.mtcs_search(2)
+
+        self.assertEqual(str(mcts.choose_best_move()), "a1a8")
+        # Every selected line starts with a root move (the root itself can be visited again through a cycle)
+        self.assertEqual(sum(edge.N for edge in mcts.root.edges.values()), mcts.num_rollouts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from io import StringIO
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from pgn import *
+
+PGN = """[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 {a comment
+on two lines} Nf6 (3... Bc5 4. c3) 4. Ng5 d5 5. exd5 Na5 $1 6. Bb5+ c6 7. dxc6 bxc6
+8. Qf3 cxb5 9. Qxa8 1-0
+
+[Event "Second"]
+[Result "0-1"]
+
+1.f3 e5 2.g4 Qh4# 0-1
+"""
+
+
+def board_from_fen(fen):
+    board = Board()
+    board.from_fen(fen)
+    return board
+
+
+def san_of(fen, uci):
+    """
+    Write the move given in UCI notation in SAN.
+    """
+    board = board_from_fen(fen)
+    move = next(move for move in generate_legal_moves(board) if move.to_uci() == uci)
+    return move_to_san(board, move)
+
+
+class TestPGN(unittest.TestCase):
+    def test_san_disambiguation(self) -> None:
+        """
+        Test if the origin of the move is given by its file, its rank or both when needed.
+        """
+        self.assertEqual(san_of("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1", "b1d2"), "Nbd2")
+        self.assertEqual(san_of("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1", "a1a3"), "R1a3")
+        self.assertEqual(san_of("4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1", "a1b2"), "Qa1b2")
+        self.assertEqual(san_of("4k3/8/8/8/8/8/8/1N2K3 w - - 0 1", "b1d2"), "Nd2")
+
+    def test_san_special_moves(self) -> None:
+        """
+        Test the castling, en passant, promotion and mate notations.
+        """
+        self.assertEqual(san_of("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1g1"), "O-O")
+        self.assertEqual(san_of("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1c1"), "O-O-O")
+        self.assertEqual(san_of("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6"), "exd6")
+        self.assertEqual(san_of("8/P7/8/8/8/8/8/k1K5 w - - 0 1", "a7a8q"), "a8=Q#")
+        self.assertEqual(san_of("8/P7/8/8/8/8/8/k1K5 w - - 0 1", "a7a8n"), "a8=N")
+
+    def test_parse_san(self) -> None:
+        """
+        Test if the SAN moves are resolved, and the illegal or ambiguous ones refused.
+        """
+        board = board_from_fen("4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1")
+        self.assertEqual(parse_san(board, "Qa1b2").to_uci(), "a1b2")
+        self.assertEqual(parse_san(board, "Qcb2+").to_uci(), "c1b2")
+        with self.assertRaises(ValueError):
+            parse_san(board, "Qb2")
+        with self.assertRaises(ValueError):
+            parse_san(board, "Nf3")
+
+        board = board_from_fen("8/P7/8/8/8/8/8/k1K5 w - - 0 1")
+        self.assertEqual(parse_san(board, "a8=N").to_uci(), "a7a8n")
+
+    def test_read_games(self) -> None:
+        """
+        Test if the games are read with their tags, moves and results, skipping comments and variations.
+        """
+        games = read_games(StringIO(PGN))
+        first = next(games)
+        self.assertEqual((first.headers["White"], first.result, len(first.moves)), ("A", "1-0", 17))
+        self.assertEqual(first.moves[4].to_uci(), "f1c4")
+
+        second = next(games)
+        self.assertEqual(second.result, "0-1")
+        self.assertEqual([move.to_uci() for move in second.moves], ["f2f3", "e7e5", "g2g4", "d8h4"])
+        self.assertIsNone(next(games, None))
+
+    def test_illegal_move(self) -> None:
+        """
+        Test if an illegal move is reported with the number of its game.
+        """
+        with self.assertRaisesRegex(ValueError, "Game 2"):
+            list(read_games(StringIO(PGN.replace("Qh4#", "Qh5#"))))
+
+    def test_round_trip(self) -> None:
+        """
+        Test if a written game is read back identical, from a FEN too.
+        """
+        for game in read_games(StringIO(PGN)):
+            text = game_to_pgn(game)
+            self.assertTrue(all(len(line) <= LINE_LENGTH for line in text.splitlines()))
+            copy = next(read_games(StringIO(text)))
+            self.assertEqual([move.to_uci() for move in copy.moves], [move.to_uci() for move in game.moves])
+            self.assertEqual(copy.result, game.result)
+
+        game = Game({"FEN": "4k3/8/8/3pP3/8/8/8/4K3 b - - 0 1", "White": 'A "quoted" name'})
+        game.moves.append(parse_san(game.initial_board(), "Kd7"))
+        text = game_to_pgn(game)
+        self.assertIn("1... Kd7 *", text)
+        copy = next(read_games(StringIO(text)))
+        self.assertEqual(copy.headers["White"], 'A "quoted" name')
+        self.assertEqual(copy.headers["SetUp"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
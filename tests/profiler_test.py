@@ -0,0 +1,67 @@
+import unittest
+import json
+import pstats
+import tempfile
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+import board
+import profiler
+from minmax import *
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+        Set up the Board instance and initialize the chessboard for each test case.
+        """
+        self.board = Board()
+        self.board.board_initialization()
+
+    def test_hot_function_timers(self) -> None:
+        """
+        Test if every hot function is timed during a search and if the original functions are put back.
+        """
+        original = board.generate_piece_moves
+        profiler.enable(report_at_exit=False)
+        try:
+            profiler.reset()
+            moves = list(generate_legal_moves(self.board))
+            best_move(self.board, 1)
+        finally:
+            profiler.disable()
+
+        self.assertEqual(len(moves), 20)
+        for name, timer in profiler.timers.items():
+            self.assertGreater(timer.calls, 0, name)
+            self.assertGreater(timer.time, 0, name)
+        self.assertIs(board.generate_piece_moves, original)
+        self.assertFalse(hasattr(Board.apply_move, "__wrapped__"))
+
+    def test_profile_call(self) -> None:
+        """
+        Test if a single search can be written as a pstats file and as a speedscope file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.prof")
+            move = profiler.profile_call(path, best_move, self.board, 1)
+            self.assertIn(move, list(generate_legal_moves(self.board)))
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+            path = os.path.join(directory, "search.speedscope.json")
+            profiler.profile_call(path, best_move, self.board, 1)
+            with open(path) as file:
+                profile = json.load(file)
+
+        events = profile["profiles"][0]["events"]
+        names = [frame["name"] for frame in profile["shared"]["frames"]]
+        self.assertIn("minimax", names)
+        self.assertEqual(sum(event["type"] == "O" for event in events), sum(event["type"] == "C" for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
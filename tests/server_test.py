@@ -0,0 +1,112 @@
+import unittest
+import asyncio
+import tempfile
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from server import *
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+MATE_FEN = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        """
+        Start a server with two engines on a Unix socket and connect a client.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = AnalysisServer(workers=2, tt_size=1 << 12, max_waiting=2)
+        await self.server.start()
+        path = os.path.join(self.directory.name, "server.sock")
+        self.listener = await self.server.serve_unix(path)
+        self.client = await Client.connect_unix(path)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def test_methods(self) -> None:
+        """
+        Test the answers of the methods.
+        """
+        moves = (await self.client.call("legal_moves", fen=START_FEN))["moves"]
+        self.assertEqual(len(moves), 20)
+        self.assertIn("e2e4", moves)
+
+        self.assertEqual((await self.client.call("perft", fen=START_FEN, depth=2))["nodes"], 400)
+
+        result = await self.client.call("bestmove", fen=MATE_FEN, depth=2)
+        self.assertEqual((result["move"], result["mate"], result["depth"]), ("a1a8", 1, 2))
+
+        result = await self.client.call("analyse", fen=MATE_FEN, depth=1, multipv=2)
+        self.assertEqual(len(result["lines"]), 2)
+        self.assertEqual(result["lines"][0]["pv"], ["a1a8"])
+
+    async def test_errors(self) -> None:
+        """
+        Test the errors of unknown methods, invalid parameters and time limits.
+        """
+        with self.assertRaises(RPCError) as context:
+            await self.client.call("play")
+        self.assertEqual(context.exception.code, METHOD_NOT_FOUND)
+
+        with self.assertRaises(RPCError) as context:
+            await self.client.call("bestmove", fen="not a fen")
+        self.assertEqual(context.exception.code, INVALID_PARAMS)
+
+        with self.assertRaises(RPCError) as context:
+            await self.client.call("perft", fen=START_FEN, depth=6, time=0.05)
+        self.assertEqual(context.exception.code, TIME_LIMIT_REACHED)
+
+    async def test_concurrent_clients(self) -> None:
+        """
+        Test if the requests of several clients are answered concurrently by the engines.
+        """
+        path = self.listener.sockets[0].getsockname()
+        other = await Client.connect_unix(path)
+        try:
+            results = await asyncio.gather(self.client.call("perft", fen=START_FEN, depth=2),
+                                           other.call("perft", fen=START_FEN, depth=2),
+                                           self.client.call("legal_moves", fen=MATE_FEN))
+        finally:
+            await other.close()
+        self.assertEqual([results[0]["nodes"], results[1]["nodes"]], [400, 400])
+
+    async def test_cancel(self) -> None:
+        """
+        Test if a cancelled search is stopped and its engine answers the next requests.
+        """
+        request_id, future = self.client.send("analyse", fen=START_FEN, depth=20)
+        await asyncio.sleep(0.2)
+        self.assertTrue(await self.client.cancel(request_id))
+
+        response = await asyncio.wait_for(future, 5)
+        self.assertEqual(response["error"]["code"], REQUEST_CANCELLED)
+        results = await asyncio.gather(*(self.client.call("perft", fen=START_FEN, depth=1) for _ in range(2)))
+        self.assertEqual([result["nodes"] for result in results], [20, 20])
+
+    async def test_server_busy(self) -> None:
+        """
+        Test if the requests are refused when too many of them wait for an engine.
+        """
+        sent = [self.client.send("analyse", fen=START_FEN, depth=20) for _ in range(5)]
+        response = await asyncio.wait_for(sent[-1][1], 5)
+        self.assertEqual(response["error"]["code"], SERVER_BUSY)
+
+        for request_id, _ in sent[:4]:
+            await self.client.cancel(request_id)
+        responses = await asyncio.wait_for(asyncio.gather(*(future for _, future in sent[:4])), 10)
+        self.assertEqual({response["error"]["code"] for response in responses}, {REQUEST_CANCELLED})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import json
+from io import StringIO
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from tournament import *
+from pgn import game_to_pgn
+
+class TestTournament(unittest.TestCase):
+    def test_elo_difference(self) -> None:
+        """
+        Test the Elo difference computed from a score of 50% and 75%.
+        """
+        self.assertEqual(elo_difference(5, 10, 5)[0], 0)
+        elo, error = elo_difference(30, 0, 10)
+        self.assertAlmostEqual(elo, 190.85, places=2)
+        self.assertTrue(0 < error < elo)
+
+    def test_sprt(self) -> None:
+        """
+        Test if the log-likelihood ratio goes to H1 for a strong bot and to H0 for an equal one.
+        """
+        llr, lower, upper = sprt(300, 100, 100, 0, 50)
+        self.assertGreater(llr, upper)
+        llr, lower, upper = sprt(100, 300, 100, 0, 50)
+        self.assertLess(llr, lower)
+
+    def test_play_game(self) -> None:
+        """
+        Test if a game ending by a checkmate is recorded with its result and moves.
+        """
+        record = play_game("minmax:1", "random", "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", seed=0)
+
+        self.assertEqual(record["result"], "1-0")
+        self.assertEqual(record["reason"], "CHECKMATE")
+        self.assertEqual(record["moves"], ["a1a8"])
+
+        text = game_to_pgn(game_from_record(record))
+        self.assertIn('[White "minmax:1"]', text)
+        self.assertIn('[FEN "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"]', text)
+        self.assertTrue(text.endswith("1. Ra8# 1-0\n\n"))
+
+    def test_run_tournament(self) -> None:
+        """
+        Test if the games alternate colors and are all written to the output.
+        """
+        output = StringIO()
+        summary = run_tournament("minmax:1", "random", 4, openings=["6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"],
+                                 workers=2, max_plies=1, output=output)
+        records = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["game"])
+
+        self.assertEqual([record["white"] for record in records], ["minmax:1", "random"] * 2)
+        self.assertEqual(summary["games"], 4)
+        self.assertEqual(summary["wins"], 2)
+        self.assertEqual(summary["wins"] + summary["draws"] + summary["losses"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
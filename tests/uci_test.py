@@ -0,0 +1,125 @@
+import unittest
+from io import StringIO
+import sys
+import os
+
+# Add the path to the 'src' folder to the system path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "..", "src")
+sys.path.insert(0, src_dir)
+
+from uci import *
+
+def run(commands):
+    """
+    Run the UCI loop on the given commands and return the output lines.
+    """
+    output = StringIO()
+    UCI(StringIO("\n".join(commands) + "\n"), output).loop()
+    return output.getvalue().splitlines()
+
+
+class TestUCI(unittest.TestCase):
+    def test_handshake(self) -> None:
+        """
+        Test if the engine answers to uci and isready.
+        """
+        output = run(["uci", "isready", "quit"])
+        self.assertEqual(output, [f"id name {ENGINE_NAME}", f"id author {ENGINE_AUTHOR}",
+                                  "option name Ponder type check default false",
+                                  f"option name MultiPV type spin default 1 min 1 max {MAX_MULTIPV}",
+                                  "option name SearchStats type check default false", "uciok", "readyok"])
+
+    def test_go_depth(self) -> None:
+        """
+        Test if the engine sends one info line per depth and the best move.
+        """
+        output = run(["position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", "go depth 2"])
+
+        self.assertEqual(len(output), 3)
+        self.assertTrue(output[0].startswith("info depth 1 score mate 1 "))
+        for field in ("nodes", "nps", "time", "pv"):
+            self.assertIn(f" {field} ", output[1])
+        self.assertEqual(output[-1], "bestmove a1a8")
+
+    def test_principal_variation(self) -> None:
+        """
+        Test if the info lines send the whole principal variation.
+        """
+        output = run(["position fen 8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", "go depth 3"])
+
+        pv = output[-2].split(" pv ")[1].split()
+        self.assertGreaterEqual(len(pv), 3)
+        self.assertEqual(output[-1], f"bestmove {pv[0]} ponder {pv[1]}")
+
+    def test_search_stats(self) -> None:
+        """
+        Test if the statistics of the search are sent after each depth when the option is set.
+        """
+        output = run(["setoption name SearchStats value true",
+                      "position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", "go depth 2"])
+
+        self.assertEqual(len(output), 5)
+        self.assertTrue(output[1].startswith("info string stats nodes "))
+        self.assertIn(" first_move_cutoffs ", output[3])
+
+    def test_multipv(self) -> None:
+        """
+        Test if the MultiPV option sends one info line per best move at each depth.
+        """
+        output = run(["setoption name MultiPV value 2",
+                      "position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", "go depth 2"])
+
+        self.assertEqual(len(output), 5)
+        self.assertTrue(output[0].startswith("info depth 1 multipv 1 score mate 1 "))
+        self.assertTrue(output[1].startswith("info depth 1 multipv 2 "))
+        self.assertTrue(output[3].startswith("info depth 2 multipv 2 "))
+        self.assertEqual(output[-1].split()[:2], ["bestmove", "a1a8"])
+
+    def test_position_moves(self) -> None:
+        """
+        Test if the moves of the position command are applied, including castling and promotion.
+        """
+        engine = UCI(StringIO(), StringIO())
+        engine.handle("position fen 4k3/1P6/8/8/8/8/8/4K2R w K - 0 1 moves e1g1 e8d7 b7b8q")
+
+        self.assertEqual(engine.board.to_fen(), "1Q6/3k4/8/8/8/8/8/5RK1 b - - 0 2")
+
+    def test_stop_infinite(self) -> None:
+        """
+        Test if an infinite search sends its best move when stopped.
+        """
+        output = run(["position startpos", "go infinite", "stop", "isready"])
+
+        self.assertTrue(output[-2].startswith("bestmove "))
+        self.assertEqual(output[-1], "readyok")
+
+    def test_ponder(self) -> None:
+        """
+        Test if a pondering search only sends its best move after the ponderhit, and keeps its time limit until then.
+        """
+        engine = UCI(StringIO(), StringIO())
+        engine.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        engine.handle("go ponder movetime 50")
+        engine.thread.join(0.3)
+        self.assertTrue(engine.thread.is_alive())
+        self.assertIsNone(engine.search.deadline)
+        self.assertNotIn("bestmove", engine.output_stream.getvalue())
+
+        engine.handle("ponderhit")
+        engine.thread.join(5)
+        self.assertFalse(engine.thread.is_alive())
+        self.assertTrue(engine.output_stream.getvalue().splitlines()[-1].startswith("bestmove a1a8"))
+
+    def test_ponder_stop(self) -> None:
+        """
+        Test if a pondering search sends its best move when stopped (the opponent played another move).
+        """
+        output = run(["position startpos", "go ponder depth 1", "stop", "isready"])
+
+        self.assertTrue(output[-2].startswith("bestmove "))
+        self.assertEqual(output[-1], "readyok")
+
+
+if __name__ == "__main__":
+    unittest.main()